@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Bounded agent memory for the travel agent prompt
+- Recent tool calls and (truncated) results live in a ring buffer
+- Entries leaving the buffer are folded into per-tool summaries
+- The rendered text is kept under a hard token budget, so prompt size
+  stays flat however long the session runs
+"""
+
+import json
+from collections import OrderedDict, deque
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), no tokenizer needed."""
+    return (len(text) + 3) // 4
+
+
+def _compact_args(arguments: dict) -> str:
+    return ", ".join(str(v) for v in arguments.values()) if arguments else ""
+
+
+class AgentMemory:
+    def __init__(self, token_budget: int = 600, recent_size: int = 6, result_chars: int = 240,
+                 summary_values: int = 5):
+        self.token_budget = token_budget
+        self.result_chars = result_chars
+        self.summary_values = summary_values
+        self.recent = deque(maxlen=max(1, recent_size))  # the latest call always stays verbatim
+        # tool -> (total calls folded, most recent distinct argument strings)
+        self.summaries: OrderedDict[str, list] = OrderedDict()
+        self._rendered = None
+
+    def __bool__(self):
+        return bool(self.recent or self.summaries)
+
+    def record(self, tool: str, arguments: dict, result: str, ok: bool = True):
+        """Remember one tool call; the oldest recent entry is folded if the buffer is full."""
+        if len(self.recent) == self.recent.maxlen:
+            self._fold(self.recent.popleft())
+        text = " ".join(result.split())
+        if len(text) > self.result_chars:
+            text = text[: self.result_chars - 1] + "…"
+        self.recent.append({"tool": tool, "arguments": arguments, "result": text, "ok": ok})
+        self._rendered = None
+
+    def _fold(self, entry: dict):
+        count, values = self.summaries.pop(entry["tool"], [0, []])
+        value = _compact_args(entry["arguments"])
+        if value in values:
+            values.remove(value)
+        values.append(value)
+        del values[: -self.summary_values]
+        self.summaries[entry["tool"]] = [count + 1, values]  # re-insert as most recently used
+
+    def _render_once(self) -> str:
+        lines = []
+        if self.summaries:
+            parts = []
+            for tool, (count, values) in self.summaries.items():
+                shown = "; ".join(v for v in values if v)
+                parts.append(f"{tool} x{count}" + (f" ({shown})" if shown else ""))
+            lines.append("Earlier: " + ", ".join(parts))
+        for e in self.recent:
+            status = "" if e["ok"] else " [failed]"
+            lines.append(f"- {e['tool']} {json.dumps(e['arguments'], ensure_ascii=False)}{status} → {e['result']}")
+        return "\n".join(lines)
+
+    def render(self) -> str:
+        """Memory text for the system prompt, folded until it fits the token budget."""
+        if self._rendered is not None:
+            return self._rendered
+        text = self._render_once()
+        while estimate_tokens(text) > self.token_budget and self.recent:
+            self._fold(self.recent.popleft())
+            text = self._render_once()
+        # Summaries alone too large: drop the least recently used tools
+        while estimate_tokens(text) > self.token_budget and len(self.summaries) > 1:
+            self.summaries.popitem(last=False)
+            text = self._render_once()
+        self._rendered = text[: self.token_budget * 4]
+        return self._rendered
+
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Offline city/airport name -> IATA code resolver
+- Bundled dataset (data/airports.tsv): major airports plus IATA metro codes
+  (NYC, LON, TYO...) that stand for every airport of a city
+- Codes, city names, airport names and aliases live in one sorted key array
+  with flat postings arrays: exact and prefix lookups are binary searches,
+  misspellings go through a trigram index
+- CLI: python airport_index.py "new york" heathrow "sao paolo"
+"""
+
+import bisect
+import re
+import sys
+import time
+from array import array
+from collections import Counter
+from pathlib import Path
+
+from ttl_cache import normalize_city
+
+DEFAULT_DATASET = Path(__file__).resolve().parent / "data" / "airports.tsv"
+FIELDS = ("code", "kind", "name", "city", "country", "metro", "aliases")
+FUZZY_CUTOFF = 0.55  # trigram (Dice) similarity a misspelt key must reach
+
+_APOSTROPHES = re.compile(r"['’]")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_CODE = re.compile(r"^[A-Za-z]{3}$")
+
+
+def normalize_name(text: str) -> str:
+    """normalize_city() plus punctuation folding: "O'Hare" -> "ohare", "St.-Denis" -> "st denis"."""
+    folded = text.casefold() if text.isascii() else normalize_city(text)
+    return " ".join(_PUNCTUATION.sub(" ", _APOSTROPHES.sub("", folded)).split())
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AirportIndex:
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        # Metro codes rank before airports for the same key, then file order
+        rank = {i: (row["kind"] != "metro", i) for i, row in enumerate(rows)}
+        self._code_ids = {row["code"]: i for i, row in enumerate(rows)}
+        self._metro_airports: dict[str, list[str]] = {}
+        keyed: dict[str, set[int]] = {}
+        for i, row in enumerate(rows):
+            names = [row["code"], row["city"], *row["aliases"]]
+            if row["kind"] == "airport":
+                names.append(row["name"])
+                if row["metro"]:
+                    self._metro_airports.setdefault(row["metro"], []).append(row["code"])
+            for name in names:
+                key = normalize_name(name)
+                if key:
+                    keyed.setdefault(key, set()).add(i)
+
+        self.keys = sorted(keyed)
+        self.offsets = array("I", [0])
+        self.postings = array("H")
+        for key in self.keys:
+            self.postings.extend(sorted(keyed[key], key=rank.__getitem__))
+            self.offsets.append(len(self.postings))
+        self._trigrams = None  # built on the first fuzzy lookup
+        self._gram_counts = None
+        self.load_ms = 0.0
+        self.lookups = 0
+        self.fuzzy_lookups = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: str | Path = DEFAULT_DATASET) -> "AirportIndex":
+        started = time.perf_counter()
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line or line.startswith("#") or line.startswith("code\t"):
+                    continue
+                row = dict(zip(FIELDS, line.split("\t")))
+                row["aliases"] = [a for a in row.get("aliases", "").split(",") if a]
+                rows.append(row)
+        index = cls(rows)
+        index.load_ms = round((time.perf_counter() - started) * 1000, 2)
+        return index
+
+    def _ids(self, k: int) -> array:
+        return self.postings[self.offsets[k]:self.offsets[k + 1]]
+
+    def _exact(self, key: str) -> int | None:
+        k = bisect.bisect_left(self.keys, key)
+        return k if k < len(self.keys) and self.keys[k] == key else None
+
+    def _prefixed(self, key: str) -> list[int]:
+        """Positions of the keys starting with `key`, shortest (closest) first."""
+        start = k = bisect.bisect_left(self.keys, key)
+        while k < len(self.keys) and self.keys[k].startswith(key):
+            k += 1
+        return sorted(range(start, k), key=lambda k: len(self.keys[k]))
+
+    def _build_trigrams(self):
+        trigram_keys: dict[str, list[int]] = {}
+        counts = array("H")
+        for k, key in enumerate(self.keys):
+            grams = _trigrams(key)
+            counts.append(len(grams))
+            for gram in grams:
+                trigram_keys.setdefault(gram, []).append(k)
+        self._gram_counts = counts
+        self._trigrams = {gram: array("I", ks) for gram, ks in trigram_keys.items()}
+
+    def _fuzzy(self, key: str) -> list[tuple[float, int]]:
+        """(similarity, key position) of keys sharing enough trigrams with `key`, most similar first."""
+        if self._trigrams is None:
+            self._build_trigrams()
+        grams = _trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+        scored = []
+        for k, common in shared.items():
+            similarity = 2 * common / (len(grams) + self._gram_counts[k])
+            if similarity >= FUZZY_CUTOFF:
+                scored.append((similarity, k))
+        scored.sort(key=lambda s: (-s[0], len(self.keys[s[1]])))
+        return scored
+
+    def _match(self, i: int, match: str, score: float) -> dict:
+        row = self.rows[i]
+        result = {"code": row["code"], "kind": row["kind"], "name": row["name"], "city": row["city"],
+                  "country": row["country"], "match": match, "score": round(score, 3)}
+        if row["kind"] == "metro":
+            result["airports"] = self._metro_airports.get(row["code"], [])
+        elif row["metro"]:
+            result["metro"] = row["metro"]
+        return result
+
+    def resolve(self, query: str, limit: int = 5) -> list[dict]:
+        """
+        Best matches for a code, city, airport name or alias: exact code, then
+        exact name, then names starting with the query, then (only when nothing
+        matched) misspellings. Metro codes come before a city's airports.
+        """
+        self.lookups += 1
+        key = normalize_name(query)
+        found, seen = [], set()
+
+        def add(ids, match, score):
+            for i in ids:
+                if len(found) < limit and i not in seen:
+                    seen.add(i)
+                    found.append(self._match(i, match, score))
+
+        if not key or limit < 1:
+            self.misses += 1
+            return found
+        if _CODE.match(key) and key.upper() in self._code_ids:
+            add([self._code_ids[key.upper()]], "code", 1.0)
+        k = self._exact(key)
+        if k is not None:
+            add(self._ids(k), "name", 1.0)
+        if len(key) >= 2:
+            for k in self._prefixed(key):
+                if len(found) >= limit:
+                    break
+                add(self._ids(k), "prefix", len(key) / len(self.keys[k]))
+        if not found and len(key) >= 4:
+            self.fuzzy_lookups += 1
+            for similarity, k in self._fuzzy(key):
+                add(self._ids(k), "fuzzy", similarity)
+        if not found:
+            self.misses += 1
+        return found
+
+    def _one_city(self, positions: list[int]) -> bool:
+        """Whether the entries under these key positions all belong to a single city."""
+        cities = {(self.rows[i]["city"], self.rows[i]["country"]) for k in positions for i in self._ids(k)}
+        return len(cities) == 1
+
+    def code_for(self, value: str) -> str | None:
+        """
+        IATA code to search flights with, only when the input is unambiguous:
+        a known code, or an exact name or alias, or a prefix (4+ characters)
+        of names, that belongs to one city ("San Jose" is two: SJC and SJO;
+        a metro code and its airports are one). Three letters that match nothing
+        pass through unchanged (the dataset is not exhaustive); anything else,
+        including misspellings, gives None so the caller can offer resolve().
+        """
+        self.lookups += 1
+        value = value.strip()
+        key = normalize_name(value)
+        if _CODE.match(key) and key.upper() in self._code_ids:
+            return key.upper()
+        k = self._exact(key)
+        if k is not None:
+            if self._one_city([k]):
+                return self.rows[self._ids(k)[0]]["code"]
+        elif len(key) >= 4:
+            prefixed = self._prefixed(key)
+            if self._one_city(prefixed):
+                return self.rows[self._ids(prefixed[0])[0]]["code"]
+        if _CODE.match(value):
+            return value.upper()
+        self.misses += 1
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.rows),
+            "keys": len(self.keys),
+            "load_ms": self.load_ms,
+            "lookups": self.lookups,
+            "fuzzy_lookups": self.fuzzy_lookups,
+            "misses": self.misses,
+        }
+
+
+if __name__ == "__main__":
+    index = AirportIndex.load()
+    print(f"Loaded {len(index.rows)} entries ({len(index.keys)} keys) in {index.load_ms} ms")
+    for query in sys.argv[1:]:
+        matches = index.resolve(query)
+        print(f"{query!r}: " + (", ".join(f"{m['code']} ({m['city']}, {m['match']})" for m in matches)
+                                or "no match"))
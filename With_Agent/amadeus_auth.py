@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Amadeus OAuth token cache
+- Caches the client-credentials token until shortly before `expires_in`
+- Refreshes in the background ahead of expiry; after a failed refresh the
+  next background attempt waits min(30 s, a quarter of the remaining lifetime)
+- Concurrent callers share a single in-flight refresh (no stampede)
+"""
+
+import asyncio
+import os
+import time
+
+TOKEN_URL = "https://test.api.amadeus.com/v1/security/oauth2/token"
+
+
+class AmadeusAuthError(Exception):
+    """Raised when the token endpoint does not return an access token."""
+
+
+class AmadeusTokenManager:
+    def __init__(self, request, client_id: str, client_secret: str, token_url: str = TOKEN_URL):
+        # request(method, url, **kwargs) -> (status, json); the server passes its instrumented helper
+        self.request = request
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_url = token_url
+        # Treat the token as expired this many seconds early (clock skew, in-flight requests)
+        self.expiry_margin = float(os.getenv("AMADEUS_TOKEN_EXPIRY_MARGIN", "30"))
+        # Start a background refresh when less than this many seconds remain
+        self.refresh_ahead = float(os.getenv("AMADEUS_TOKEN_REFRESH_AHEAD", "300"))
+        self._token = None
+        self._expires_at = 0.0
+        self._lifetime = 0.0
+        self._refresh_task = None
+        self._retry_at = 0.0  # no background refresh before this (monotonic) time
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.background_refreshes = 0
+        self.failures = 0
+
+    def _remaining(self) -> float:
+        return self._expires_at - time.monotonic()
+
+    async def get_token(self) -> str:
+        """Return a valid access token, fetching one only when the cache cannot serve it."""
+        remaining = self._remaining()
+        if self._token and remaining > self.expiry_margin:
+            self.hits += 1
+            refresh_ahead = min(self.refresh_ahead, self._lifetime / 2)
+            if remaining < refresh_ahead and self._refresh_task is None and time.monotonic() >= self._retry_at:
+                self.background_refreshes += 1
+                self._start_refresh()
+            return self._token
+
+        self.misses += 1
+        task = self._refresh_task or self._start_refresh()
+        # Shield so one cancelled caller does not abort the refresh the others wait on
+        return await asyncio.shield(task)
+
+    def invalidate(self):
+        """Drop the cached token, e.g. after the API answered 401."""
+        self._token = None
+        self._expires_at = 0.0
+
+    def _start_refresh(self) -> asyncio.Task:
+        task = asyncio.ensure_future(self._fetch_token())
+        self._refresh_task = task
+        task.add_done_callback(self._refresh_done)
+        return task
+
+    def _refresh_done(self, task: asyncio.Task):
+        if self._refresh_task is task:
+            self._refresh_task = None
+        # Background refreshes have no awaiting caller; mark their errors as retrieved
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+            # The cached token is still served meanwhile; don't hammer a failing endpoint
+            self._retry_at = time.monotonic() + min(30.0, max(0.0, self._remaining()) / 4)
+
+    async def _fetch_token(self) -> str:
+        self.refreshes += 1
+        _, token_data = await self.request("POST", self.token_url, data={
+            "grant_type": "client_credentials",
+            "client_id": self.client_id,
+            "client_secret": self.client_secret
+        })
+        if "access_token" not in token_data:
+            raise AmadeusAuthError(token_data)
+        self._token = token_data["access_token"]
+        self._lifetime = float(token_data.get("expires_in", 1799))
+        self._expires_at = time.monotonic() + self._lifetime
+        self._retry_at = 0.0
+        return self._token
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "background_refreshes": self.background_refreshes,
+            "failures": self.failures,
+            "token_ttl_remaining": max(0.0, round(self._remaining(), 1)) if self._token else 0.0,
+        }
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for rendered itinerary PDFs
+- Files are keyed by a hash of (city, days, attractions, template version)
+- Existing artifacts are returned immediately; identical concurrent
+  requests share one render, which is cancelled only when every
+  requester has gone (see singleflight.py)
+- Writes go to a temp file and are renamed into place atomically; the temp
+  file is removed once `render` has returned (RenderPool.submit does not
+  return before a started job has finished, even when cancelled)
+- Least-recently-used files are evicted once the directory exceeds its quota
+"""
+
+import hashlib
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+
+from singleflight import SingleFlight
+
+
+class ArtifactStore:
+    def __init__(self, root: str = "itineraries", quota_bytes: int = 200 * 1024 * 1024):
+        self.root = Path(root)
+        self.quota_bytes = quota_bytes
+        self._renders = SingleFlight()
+        self.hits = 0
+        self.renders = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(city: str, days: int, attractions: list[str], template_version: str) -> str:
+        """Stable artifact key: readable city slug plus a digest of every render input."""
+        payload = json.dumps([city, days, attractions, template_version], ensure_ascii=False)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:20]
+        slug = re.sub(r"[^a-z0-9]+", "-", city.lower()).strip("-")[:40] or "city"
+        return f"itinerary_{slug}_{digest}"
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"{key}.pdf"
+
+    def get(self, key: str) -> Path | None:
+        path = self.path_for(key)
+        try:
+            os.utime(path)  # bump mtime: eviction order is least recently used first
+        except FileNotFoundError:
+            return None
+        return path
+
+    async def get_or_render(self, key: str, render) -> tuple[Path, bool]:
+        """
+        Return (path, cached). On a miss `await render(tmp_path)` writes the file,
+        which is then renamed into place. Concurrent callers for the same key
+        wait on the same render, running in its own task: a caller that is
+        cancelled only stops waiting.
+        """
+        path = self.get(key)
+        if path is not None:
+            self.hits += 1
+            return path, True
+        shared = self._renders.in_flight(key)
+        if shared:
+            self.hits += 1
+        return await self._renders.do(key, lambda: self._render(key, render)), shared
+
+    async def _render(self, key: str, render) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(key)
+        tmp = self.root / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            await render(str(tmp))
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self.renders += 1
+        self.enforce_quota(keep=path)
+        return path
+
+    def enforce_quota(self, keep: Path | None = None):
+        """Delete least-recently-used PDFs until the directory fits the quota."""
+        files = []
+        total = 0
+        for entry in os.scandir(self.root):
+            if entry.name.endswith(".pdf") and entry.is_file():
+                st = entry.stat()
+                files.append((st.st_mtime, st.st_size, Path(entry.path)))
+                total += st.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.quota_bytes:
+                break
+            if keep is not None and path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "renders": self.renders, "evictions": self.evictions}
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+JSONL input/output for the agent client's batch mode
+- read_queries(): one query per line, either {"id": ..., "query": "..."} or a bare JSON string
+- OrderedWriter: results finish in any order but are written (and flushed) in input order
+- Checkpoint: <out>.checkpoint records how many results are durable in the output file;
+  a resumed run truncates the output to that point and continues from the next query
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+
+def read_queries(path: str) -> tuple[list[dict], str]:
+    """Queries in file order plus a fingerprint of the file (checkpoints only resume the same input)."""
+    raw = Path(path).read_bytes()
+    queries = []
+    for lineno, line in enumerate(raw.decode("utf-8").splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"{path}:{lineno}: invalid JSON ({e})") from e
+        if isinstance(item, str):
+            item = {"query": item}
+        if not isinstance(item, dict) or not isinstance(item.get("query"), str):
+            raise ValueError(f"{path}:{lineno}: expected a string or an object with a \"query\" string")
+        item.setdefault("id", len(queries))
+        queries.append(item)
+    return queries, hashlib.sha256(raw).hexdigest()
+
+
+class Checkpoint:
+    def __init__(self, out_path: str, fingerprint: str):
+        self.path = Path(str(out_path) + ".checkpoint")
+        self.fingerprint = fingerprint
+
+    def load(self) -> tuple[int, int]:
+        """(results completed, output bytes) from an earlier run on the same input, else (0, 0)."""
+        try:
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return 0, 0
+        if state.get("input_sha256") != self.fingerprint:
+            return 0, 0
+        return int(state["completed"]), int(state["output_bytes"])
+
+    def save(self, completed: int, output_bytes: int, done: bool = False):
+        state = {"input_sha256": self.fingerprint, "completed": completed,
+                 "output_bytes": output_bytes, "done": done}
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class OrderedWriter:
+    """Buffers out-of-order results and appends them to the JSONL output in index order."""
+
+    def __init__(self, out_path: str, checkpoint: Checkpoint, start: int = 0, offset: int = 0,
+                 checkpoint_every: int = 20):
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.next = start
+        self._pending: dict[int, dict] = {}
+        self._saved = start
+        if start and Path(out_path).exists():
+            self._file = open(out_path, "r+b")
+            self._file.truncate(offset)  # drop lines written after the last checkpoint
+            self._file.seek(offset)
+        else:
+            self.next = self._saved = 0
+            self._file = open(out_path, "wb")
+
+    def add(self, index: int, record: dict):
+        self._pending[index] = record
+        while self.next in self._pending:
+            line = json.dumps(self._pending.pop(self.next), ensure_ascii=False) + "\n"
+            self._file.write(line.encode("utf-8"))
+            self.next += 1
+        self._file.flush()
+        if self.next - self._saved >= self.checkpoint_every:
+            self._save()
+
+    def _save(self, done: bool = False):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.checkpoint.save(self.next, self._file.tell(), done)
+        self._saved = self.next
+
+    def close(self, done: bool = False):
+        """Persist everything written so far; results still waiting on an earlier index are dropped."""
+        self._save(done)
+        self._file.close()
+
+
+def latency_summary(latencies: list[float]) -> dict:
+    if not latencies:
+        return {"p50_s": 0.0, "p95_s": 0.0, "p99_s": 0.0, "max_s": 0.0}
+    ordered = sorted(latencies)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+    return {"p50_s": pick(0.50), "p95_s": pick(0.95), "p99_s": pick(0.99), "max_s": round(ordered[-1], 3)}
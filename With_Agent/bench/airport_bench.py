@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Airport resolver benchmark (airport_index.py, no network)
+- Load time of the bundled dataset, and of the trigram index built by the first fuzzy lookup
+- Lookup latency and throughput per query kind: IATA code, city, alias,
+  prefix, misspelling, no match, plus code_for() as the flight tools call it
+
+    python bench/airport_bench.py --lookups 20000
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+sys.path.insert(0, str(HERE))
+
+from airport_index import AirportIndex, DEFAULT_DATASET  # noqa: E402
+from run_bench import git_revision  # noqa: E402
+
+QUERIES = {
+    "code": ["DEL", "lhr", "JFK", "nyc", "CDG", "SIN", "dxb", "HND"],
+    "city": ["New York", "London", "Mumbai", "São Paulo", "Zürich", "Tokyo", "Rio de Janeiro", "Cape Town"],
+    "alias": ["Bombay", "Bangalore", "Heathrow", "Peking", "Saigon", "Bali", "Kiev", "Washington DC"],
+    "prefix": ["Lon", "San Fr", "Frankf", "Johannes", "Kuala", "Amster", "Barcel", "Bangk"],
+    "fuzzy": ["Londn", "Sao Paolo", "San Fransisco", "Barcelonna", "Banglore", "Singapur", "Moskow", "Istambul"],
+    "miss": ["Nowhere Town", "Xanadu", "Gotham City", "Springfield Falls"],
+}
+
+
+def load_times(path: Path, repeat: int) -> dict:
+    loads, trigram_builds = [], []
+    for _ in range(repeat):
+        index = AirportIndex.load(path)
+        loads.append(index.load_ms)
+        t0 = time.perf_counter()
+        index.resolve("xqzv wibble")  # no exact/prefix hit: builds the trigram index
+        trigram_builds.append((time.perf_counter() - t0) * 1000)
+    return {"load_ms_median": round(statistics.median(loads), 2), "load_ms_max": round(max(loads), 2),
+            "first_fuzzy_lookup_ms_median": round(statistics.median(trigram_builds), 2),
+            "entries": len(index.rows), "keys": len(index.keys), "dataset_bytes": path.stat().st_size}
+
+
+def throughput(fn, queries: list[str], lookups: int) -> dict:
+    rounds = max(1, lookups // len(queries))
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for query in queries:
+            fn(query)
+    elapsed = time.perf_counter() - t0
+    n = rounds * len(queries)
+    return {"lookups": n, "us_per_lookup": round(elapsed / n * 1e6, 2), "lookups_per_s": round(n / elapsed)}
+
+
+def main(args):
+    path = Path(args.dataset)
+    results = {"load": load_times(path, args.repeat), "lookups": {}}
+    index = AirportIndex.load(path)
+    index.resolve("xqzv wibble")  # measure steady-state lookups, not the one-off trigram build
+    for kind, queries in QUERIES.items():
+        results["lookups"][kind] = throughput(index.resolve, queries, args.lookups)
+    mixed = [q for queries in QUERIES.values() for q in queries]
+    results["lookups"]["code_for_mixed"] = throughput(index.code_for, mixed, args.lookups)
+
+    load = results["load"]
+    print(f"load        {load['load_ms_median']:>8.2f} ms median ({load['entries']} entries, {load['keys']} keys, "
+          f"{load['dataset_bytes']} bytes); first fuzzy lookup {load['first_fuzzy_lookup_ms_median']:.2f} ms")
+    for kind, row in results["lookups"].items():
+        print(f"{kind:<15} {row['us_per_lookup']:>8.2f} us/lookup  {row['lookups_per_s']:>9,} lookups/s")
+
+    report = {"git_revision": git_revision(), "python": platform.python_version(), "repeat": args.repeat,
+              "results": results}
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"📄 Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Airport resolver benchmark")
+    parser.add_argument("--dataset", default=str(DEFAULT_DATASET))
+    parser.add_argument("--lookups", type=int, default=20000, help="lookups per query kind")
+    parser.add_argument("--repeat", type=int, default=20, help="index loads to time")
+    parser.add_argument("--out", default="bench_results_airports.json")
+    main(parser.parse_args())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Itinerary planner benchmark (itinerary_planner.py, no network)
+- Synthetic city: candidate places scattered around a centre, like OpenTripMap radius results
+- Per candidate count: distance matrix, clustering and the full plan_days() time,
+  both keeping ITINERARY_PLACES_PER_DAY places per day and touring every candidate
+- Route quality: walk length in input order vs nearest neighbour vs nearest neighbour + 2-opt
+
+    python bench/itinerary_bench.py --sizes 50,200,500,1000,2000 --days 4
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+sys.path.insert(0, str(HERE))
+
+from itinerary_planner import (cluster, haversine_matrix, nearest_neighbour_route,  # noqa: E402
+                               plan_days, route_length, two_opt)
+from run_bench import git_revision  # noqa: E402
+
+CENTRE = (48.8566, 2.3522)
+
+
+def synthetic_places(n: int, radius_km: float, seed: int) -> list[dict]:
+    """Uniform over a disc, plus a few denser neighbourhoods (old town, museum quarter...)."""
+    rng = np.random.default_rng(seed)
+    hubs = rng.uniform(-0.6, 0.6, size=(4, 2)) * radius_km
+    in_hub = rng.random(n) < 0.4
+    r = radius_km * np.sqrt(rng.random(n))
+    bearing = rng.uniform(0, 2 * np.pi, n)
+    north, east = r * np.cos(bearing), r * np.sin(bearing)
+    hub = hubs[rng.integers(len(hubs), size=n)]
+    north = np.where(in_hub, hub[:, 0] + rng.normal(0, radius_km / 15, n), north)
+    east = np.where(in_hub, hub[:, 1] + rng.normal(0, radius_km / 15, n), east)
+    lat = CENTRE[0] + north / 111.32
+    lon = CENTRE[1] + east / (111.32 * np.cos(np.radians(CENTRE[0])))
+    rate = rng.integers(1, 8, n)
+    return [{"name": f"Place {i}", "lat": float(lat[i]), "lon": float(lon[i]), "rate": int(rate[i])}
+            for i in range(n)]
+
+
+def timed(fn, repeat: int) -> float:
+    """Median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return round(statistics.median(samples) * 1000, 2)
+
+
+def route_quality(places: list[dict], days: int) -> dict:
+    """Total walk over all days (every candidate visited) for three orderings of the same groups."""
+    lat = np.array([p["lat"] for p in places])
+    lon = np.array([p["lon"] for p in places])
+    labels = cluster(lat, lon, days)
+    totals = {"input_order_km": 0.0, "nearest_neighbour_km": 0.0, "two_opt_km": 0.0}
+    for group in range(labels.max() + 1):
+        members = np.flatnonzero(labels == group)
+        dist = haversine_matrix(np.concatenate(([CENTRE[0]], lat[members])),
+                                np.concatenate(([CENTRE[1]], lon[members])))
+        nn = nearest_neighbour_route(dist)
+        totals["input_order_km"] += route_length(np.arange(len(dist)), dist)
+        totals["nearest_neighbour_km"] += route_length(nn, dist)
+        totals["two_opt_km"] += route_length(two_opt(nn, dist), dist)
+    return {k: round(v, 1) for k, v in totals.items()}
+
+
+def main(args):
+    results = []
+    for n in (int(s) for s in args.sizes.split(",")):
+        places = synthetic_places(n, args.radius_km, args.seed)
+        lat = np.array([p["lat"] for p in places])
+        lon = np.array([p["lon"] for p in places])
+        row = {
+            "places": n,
+            "distance_matrix_ms": timed(lambda: haversine_matrix(lat, lon), args.repeat),
+            "cluster_ms": timed(lambda: cluster(lat, lon, args.days), args.repeat),
+            "plan_ms": timed(lambda: plan_days(places, args.days, CENTRE, args.per_day), args.repeat),
+            "plan_all_places_ms": timed(lambda: plan_days(places, args.days, CENTRE), args.repeat),
+            **route_quality(places, args.days),
+        }
+        results.append(row)
+        print(f"{n:>6} places  matrix {row['distance_matrix_ms']:>7.2f} ms  cluster {row['cluster_ms']:>7.2f} ms  "
+              f"plan {row['plan_ms']:>7.2f} ms  plan(all) {row['plan_all_places_ms']:>8.2f} ms  "
+              f"walk km: input {row['input_order_km']:.0f} / nn {row['nearest_neighbour_km']:.0f} "
+              f"/ 2-opt {row['two_opt_km']:.0f}")
+
+    report = {"git_revision": git_revision(), "python": platform.python_version(), "numpy": np.__version__,
+              "days": args.days, "per_day": args.per_day, "radius_km": args.radius_km,
+              "repeat": args.repeat, "results": results}
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"📄 Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Itinerary planner benchmark")
+    parser.add_argument("--sizes", default="50,100,200,500,1000,2000", help="comma-separated candidate counts")
+    parser.add_argument("--days", type=int, default=4)
+    parser.add_argument("--per-day", type=int, default=6, help="places kept per day (ITINERARY_PLACES_PER_DAY)")
+    parser.add_argument("--radius-km", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default="bench_results_itinerary.json")
+    main(parser.parse_args())
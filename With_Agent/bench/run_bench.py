@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the Travel MCP Server
+- Starts bench/stub_upstreams.py in-process and points the server at it
+- Drives the MCP tools in-process (FastMCP.call_tool) and/or over stdio
+  (ClientSession against a `python travel_server.py` subprocess)
+- Fixed concurrency levels; throughput and p50/p95/p99 latency per tool
+- Results are saved as JSON so runs can be compared
+
+    python bench/run_bench.py --mode inprocess stdio --concurrency 1 8 32 --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+SERVER_DIR = HERE.parent
+sys.path.insert(0, str(SERVER_DIR))
+sys.path.insert(0, str(HERE))
+
+from stub_upstreams import start_stub, base_urls, behaviour_from_args, add_behaviour_args  # noqa: E402
+
+CITIES = ["Paris", "Rome", "Barcelona", "Tokyo", "New York", "London", "Berlin", "Lisbon", "Prague",
+          "Vienna", "Istanbul", "Dubai", "Singapore", "Bangkok", "Sydney", "Delhi", "Mumbai", "Bengaluru",
+          "Cairo", "Toronto", "Mexico City", "São Paulo", "Buenos Aires", "Seoul", "Kyoto", "Amsterdam",
+          "Zürich", "Athens", "Budapest", "Dublin"]
+AIRPORTS = ["DEL", "BOM", "BLR", "MAA", "CCU", "HYD", "GOI", "COK", "DXB", "SIN", "LHR", "CDG"]
+
+# Tool replies that are error messages rather than results
+ERROR_PREFIXES = ("Weather Error", "No flights found", "Amadeus Auth Error", "City lookup failed",
+                  "Itinerary renderer busy", "Upstream unavailable", "Unknown airport", "Error executing tool")
+
+
+def workload(tool: str, rnd: random.Random) -> dict:
+    """Arguments for one call; cities and routes repeat so caches see realistic reuse."""
+    if tool == "get_weather":
+        return {"city": rnd.choice(CITIES)}
+    if tool == "get_weather_batch":
+        return {"cities": rnd.sample(CITIES, 3)}
+    if tool == "get_flight_details":
+        origin, destination = rnd.sample(AIRPORTS, 2)
+        return {"origin": origin, "destination": destination, "date": f"2026-11-{rnd.randint(1, 28):02d}"}
+    if tool == "search_flights":
+        day = rnd.randint(1, 25)
+        return {"origins": rnd.sample(AIRPORTS[:4], 2), "destinations": rnd.sample(AIRPORTS[4:], 2),
+                "date_from": f"2026-11-{day:02d}", "date_to": f"2026-11-{day + 2:02d}"}
+    if tool == "generate_itinerary_pdf":
+        return {"city": rnd.choice(CITIES), "days": rnd.randint(1, 5)}
+    raise ValueError(f"No workload for tool {tool}")
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def is_error(text: str) -> bool:
+    return text.startswith(ERROR_PREFIXES)
+
+
+async def drive(call, tool: str, concurrency: int, requests: int, seed: int) -> dict:
+    """Issue `requests` calls with `concurrency` workers; return throughput and latency stats."""
+    rnd = random.Random(seed)
+    args = [workload(tool, rnd) for _ in range(requests)]
+    latencies, errors = [], 0
+    queue = iter(args)
+
+    async def worker():
+        nonlocal errors
+        for a in queue:
+            t0 = time.perf_counter()
+            try:
+                text = await call(tool, a)
+                failed = is_error(text)
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - t0)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    return {
+        "tool": tool,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(requests / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+def _text(content) -> str:
+    return "\n".join(getattr(c, "text", "") for c in content)
+
+
+async def run_inprocess(tools, levels, requests, seed) -> list[dict]:
+    import travel_server
+
+    async def call(tool, arguments):
+        result = await travel_server.mcp.call_tool(tool, arguments)
+        content = result[0] if isinstance(result, tuple) else result
+        return _text(content)
+
+    results = []
+    async with travel_server.lifespan(travel_server.mcp):
+        for tool in tools:
+            for level in levels:
+                results.append({"mode": "inprocess", **await drive(call, tool, level, requests, seed)})
+                print_row(results[-1])
+    return results
+
+
+async def run_stdio(tools, levels, requests, seed) -> list[dict]:
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    params = StdioServerParameters(command=sys.executable, args=[str(SERVER_DIR / "travel_server.py")],
+                                   env=dict(os.environ), cwd=str(SERVER_DIR))
+    results = []
+    async with stdio_client(params, errlog=open(os.devnull, "w")) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+
+            async def call(tool, arguments):
+                result = await session.call_tool(tool, arguments)
+                text = _text(result.content)
+                return f"Error executing tool {text}" if result.isError else text
+
+            for tool in tools:
+                for level in levels:
+                    results.append({"mode": "stdio", **await drive(call, tool, level, requests, seed)})
+                    print_row(results[-1])
+    return results
+
+
+def print_row(r: dict):
+    print(f"{r['mode']:<10} {r['tool']:<24} c={r['concurrency']:<4} {r['throughput_rps']:>8.1f} rps  "
+          f"p50 {r['p50_ms']:>8.1f}  p95 {r['p95_ms']:>8.1f}  p99 {r['p99_ms']:>8.1f} ms  "
+          f"errors {r['errors']}/{r['requests']}")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp(prefix="travel-bench-")
+    # Server configuration must be in the environment before travel_server is imported or spawned
+    os.environ.update(base_urls(args.stub_host, args.stub_port))
+    os.environ.update({
+        "AMADEUS_API_KEY": "bench", "AMADEUS_API_SECRET": "bench",
+        "WEATHER_API_KEY": "bench", "OPENTRIPMAP_API_KEY": "bench",
+        "GEOCODE_DB": os.path.join(workdir, "geocode.sqlite3"),
+        "ITINERARY_DIR": os.path.join(workdir, "itineraries"),
+        "WEATHER_CACHE_FILE": "",
+    })
+    # Measure the server, not the production quotas, unless a limit was set explicitly
+    os.environ.setdefault("RATE_LIMIT_RPS", "0")
+    behaviour = behaviour_from_args(args)
+    stub = await start_stub(args.stub_host, args.stub_port, behaviour)
+    print(f"Stub upstreams on http://{args.stub_host}:{args.stub_port} (workdir {workdir})")
+    results = []
+    try:
+        for mode in args.mode:
+            runner = run_inprocess if mode == "inprocess" else run_stdio
+            results += await runner(args.tools, args.concurrency, args.requests, args.seed)
+    finally:
+        await stub.cleanup()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "requests": args.requests, "seed": args.seed, "concurrency": args.concurrency,
+            "upstreams": {name: vars(b) for name, b in behaviour.items()},
+        },
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"📄 Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline Travel MCP Server benchmark")
+    parser.add_argument("--mode", nargs="+", choices=["inprocess", "stdio"], default=["inprocess", "stdio"])
+    parser.add_argument("--tools", nargs="+", default=["get_weather", "get_flight_details", "generate_itinerary_pdf"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="calls per tool per concurrency level")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--stub-host", default="127.0.0.1")
+    parser.add_argument("--stub-port", type=int, default=8900)
+    parser.add_argument("--out", default="bench_results.json")
+    add_behaviour_args(parser)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Start-up benchmark for the Travel MCP Server and agent client
+- Import time of travel_server and travel_client in fresh interpreters
+- Time to first result along the interactive client's own path: open_session()
+  (spawn or connect, initialize, tool list), then one agent() query
+  - cold: a stdio server spawned for the run, as travel_client.py does by default
+  - warm: an already running `travel_server.py --http`, as with --url
+- Upstreams are served by bench/stub_upstreams.py; results are saved as JSON
+
+    python bench/startup_bench.py --repeat 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+SERVER_DIR = HERE.parent
+sys.path.insert(0, str(SERVER_DIR))
+sys.path.insert(0, str(HERE))
+
+from stub_upstreams import start_stub, base_urls  # noqa: E402
+from run_bench import git_revision  # noqa: E402
+
+IMPORT_PROBE = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def import_seconds(module: str, repeat: int) -> list[float]:
+    env = {k: v for k, v in os.environ.items() if k != "GEMINI_API_KEY"}  # the client must not need it to start
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", IMPORT_PROBE.format(module=module)], cwd=SERVER_DIR,
+                             env=env, capture_output=True, text=True, check=True).stdout
+        samples.append(float(out.strip().splitlines()[-1]))
+    return samples
+
+
+async def first_result(server_url: str | None, query: str = "weather in Paris") -> dict:
+    """What travel_client.main() does before the user sees the first answer."""
+    import travel_client
+
+    t0 = time.perf_counter()
+    # The spawned server gets the stub URLs and keys (by default the client passes only PATH, HOME...)
+    async with travel_client.open_session(server_url, env=dict(os.environ)) as (session, catalog):
+        connected = time.perf_counter()
+        text, ok = await travel_client.agent(query, session, travel_client.AgentMemory(), catalog,
+                                             travel_client.PlanCache())
+        done = time.perf_counter()
+    if not ok:
+        raise RuntimeError(f"First query failed: {text}")
+    return {"connect_s": connected - t0, "first_query_s": done - connected, "time_to_first_result_s": done - t0}
+
+
+async def time_runs(server_url: str | None, repeat: int) -> dict:
+    phases = {}
+    for _ in range(repeat):
+        for name, seconds in (await first_result(server_url)).items():
+            phases.setdefault(name, []).append(seconds)
+    return phases
+
+
+def start_http_server(port: int, timeout: float = 30.0) -> subprocess.Popen:
+    """`travel_server.py --http` in the background, returned once /readyz answers."""
+    server = subprocess.Popen([sys.executable, str(SERVER_DIR / "travel_server.py"), "--http", "--port", str(port)],
+                              cwd=SERVER_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError(f"HTTP server on port {port} was not ready after {timeout:g}s")
+
+
+def summarize(samples: list[float]) -> dict:
+    return {"median_ms": round(statistics.median(samples) * 1000, 1),
+            "min_ms": round(min(samples) * 1000, 1), "max_ms": round(max(samples) * 1000, 1)}
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp(prefix="travel-startup-")
+    os.environ.update(base_urls(args.stub_host, args.stub_port))
+    os.environ.update({
+        "AMADEUS_API_KEY": "bench", "AMADEUS_API_SECRET": "bench",
+        "WEATHER_API_KEY": "bench", "OPENTRIPMAP_API_KEY": "bench",
+        "GEOCODE_DB": os.path.join(workdir, "geocode.sqlite3"),
+        "ITINERARY_DIR": os.path.join(workdir, "itineraries"),
+        # No cached weather: every run's first query reaches the (stub) upstream
+        "WEATHER_CACHE_FILE": "", "WEATHER_CACHE_TTL": "0", "WEATHER_CACHE_STALE": "0", "RATE_LIMIT_RPS": "0",
+    })
+    os.chdir(SERVER_DIR)  # the client spawns `python travel_server.py` from the working directory
+    results = {
+        "import": {module: summarize(import_seconds(module, args.repeat))
+                   for module in ("travel_server", "travel_client")},
+    }
+    stub = await start_stub(args.stub_host, args.stub_port)
+    server = None
+    try:
+        results["cold_stdio"] = {k: summarize(v) for k, v in (await time_runs(None, args.repeat)).items()}
+        server = start_http_server(args.http_port)
+        url = f"http://127.0.0.1:{args.http_port}/mcp"
+        results["warm_http"] = {k: summarize(v) for k, v in (await time_runs(url, args.repeat)).items()}
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        await stub.cleanup()
+
+    for section, rows in results.items():
+        for name, s in rows.items():
+            print(f"{section:<12} {name:<24} median {s['median_ms']:>8.1f} ms  "
+                  f"(min {s['min_ms']:.1f}, max {s['max_ms']:.1f})")
+
+    report = {"git_revision": git_revision(), "python": sys.version.split()[0], "repeat": args.repeat,
+              "results": results}
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"📄 Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Travel MCP start-up benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--http-port", type=int, default=8902, help="port of the warm HTTP server")
+    parser.add_argument("--stub-host", default="127.0.0.1")
+    parser.add_argument("--stub-port", type=int, default=8901)
+    parser.add_argument("--out", default="bench_results_startup.json")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for Amadeus, OpenWeather and OpenTripMap
+- Replays realistic payloads shaped like the real APIs (deterministic per query)
+- Configurable latency, jitter and error rate per upstream
+- One aiohttp app; each upstream lives under its own prefix:
+    AMADEUS_BASE_URL=http://127.0.0.1:8900/amadeus
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8900/openweather
+    OPENTRIPMAP_BASE_URL=http://127.0.0.1:8900/opentripmap/0.1/en
+
+Run standalone:
+    python bench/stub_upstreams.py --port 8900 --latency-ms 80 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+UPSTREAMS = ("amadeus", "openweather", "opentripmap")
+CARRIERS = ["AI", "6E", "UK", "SG", "LH", "BA", "EK", "QR", "AF", "SQ"]
+CONDITIONS = ["clear sky", "few clouds", "scattered clouds", "broken clouds", "light rain",
+              "moderate rain", "thunderstorm", "mist", "overcast clouds", "light snow"]
+KINDS = ["museums", "churches", "historic_architecture", "gardens_and_parks", "monuments",
+         "bridges", "theatres_and_entertainments", "view_points", "squares", "palaces"]
+
+
+def _rng(*parts) -> random.Random:
+    """Deterministic RNG per query, so repeated requests get identical payloads."""
+    seed = hashlib.sha256("|".join(str(p).casefold() for p in parts).encode()).digest()
+    return random.Random(int.from_bytes(seed[:8], "big"))
+
+
+def _city_coords(city: str) -> tuple[float, float]:
+    r = _rng("geo", city)
+    return round(r.uniform(-55, 65), 5), round(r.uniform(-170, 170), 5)
+
+
+class UpstreamBehaviour:
+    """Latency and failure injection for one upstream."""
+
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 20.0, error_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+
+    async def apply(self):
+        self.requests += 1
+        delay = max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            if random.random() < 0.5:
+                raise web.HTTPTooManyRequests(
+                    text='{"errors":[{"status":429,"code":38194,"title":"Too many requests"}]}',
+                    content_type="application/json", headers={"Retry-After": "1"},
+                )
+            raise web.HTTPInternalServerError(
+                text='{"errors":[{"status":500,"title":"Internal error"}]}', content_type="application/json"
+            )
+
+
+# ---------- Amadeus ----------
+async def amadeus_token(request):
+    await request.app["behaviour"]["amadeus"].apply()
+    form = await request.post()
+    if not form.get("client_id"):
+        return web.json_response({"error": "invalid_client", "error_description": "Client credentials are invalid",
+                                  "code": 38187, "title": "Invalid parameters"}, status=401)
+    return web.json_response({
+        "type": "amadeusOAuth2Token",
+        "username": "bench@example.com",
+        "application_name": "bench",
+        "client_id": form["client_id"],
+        "token_type": "Bearer",
+        "access_token": uuid.uuid4().hex,
+        "expires_in": 1799,
+        "state": "approved",
+        "scope": "",
+    })
+
+
+async def amadeus_offers(request):
+    await request.app["behaviour"]["amadeus"].apply()
+    q = request.query
+    origin, destination, day = q.get("originLocationCode"), q.get("destinationLocationCode"), q.get("departureDate")
+    if not (origin and destination and day):
+        return web.json_response({"errors": [{"status": 400, "code": 32171, "title": "MANDATORY DATA MISSING"}]},
+                                 status=400)
+    r = _rng("offers", origin, destination, day)
+    count = min(int(q.get("max", 250)), r.randint(5, 40))
+    base = datetime.fromisoformat(day)
+    data = []
+    for i in range(count):
+        carrier = r.choice(CARRIERS)
+        stops = r.choices([0, 1, 2], weights=[5, 4, 1])[0]
+        depart = base + timedelta(minutes=r.randint(0, 23 * 60))
+        segments, t = [], depart
+        airports = [origin] + [r.choice(["DXB", "DOH", "FRA", "LHR", "SIN", "BOM"]) for _ in range(stops)] + [destination]
+        for a, b in zip(airports, airports[1:]):
+            hop = timedelta(minutes=r.randint(60, 540))
+            segments.append({
+                "departure": {"iataCode": a, "at": t.isoformat(timespec="seconds")},
+                "arrival": {"iataCode": b, "at": (t + hop).isoformat(timespec="seconds")},
+                "carrierCode": carrier,
+                "number": str(r.randint(100, 9999)),
+                "aircraft": {"code": r.choice(["320", "321", "738", "789", "77W"])},
+                "duration": f"PT{hop.seconds // 3600}H{hop.seconds % 3600 // 60}M",
+                "numberOfStops": 0,
+            })
+            t += hop + timedelta(minutes=r.randint(45, 180))
+        total = datetime.fromisoformat(segments[-1]["arrival"]["at"]) - depart
+        minutes = int(total.total_seconds() // 60)
+        price = round(r.uniform(2500, 60000) * (1 + 0.15 * stops), 2)
+        data.append({
+            "type": "flight-offer",
+            "id": str(i + 1),
+            "source": "GDS",
+            "oneWay": False,
+            "numberOfBookableSeats": r.randint(1, 9),
+            "itineraries": [{"duration": f"PT{minutes // 60}H{minutes % 60}M", "segments": segments}],
+            "price": {"currency": q.get("currencyCode", "EUR"), "total": f"{price:.2f}",
+                      "base": f"{price * 0.8:.2f}", "grandTotal": f"{price:.2f}"},
+            "validatingAirlineCodes": [carrier],
+        })
+    return web.json_response({"meta": {"count": len(data)}, "data": data})
+
+
+# ---------- OpenWeather ----------
+async def openweather_current(request):
+    await request.app["behaviour"]["openweather"].apply()
+    city = request.query.get("q", "")
+    if not request.query.get("appid"):
+        return web.json_response({"cod": 401, "message": "Invalid API key."}, status=401)
+    if not city:
+        return web.json_response({"cod": "400", "message": "Nothing to geocode"}, status=400)
+    r = _rng("weather", city, datetime.now(timezone.utc).strftime("%Y%m%d%H"))
+    lat, lon = _city_coords(city)
+    temp_c = r.uniform(-10, 38)
+    units = request.query.get("units", "standard")
+    temp = {"metric": temp_c, "imperial": temp_c * 9 / 5 + 32}.get(units, temp_c + 273.15)
+    condition = r.choice(CONDITIONS)
+    return web.json_response({
+        "coord": {"lon": lon, "lat": lat},
+        "weather": [{"id": 800, "main": condition.split()[-1].title(), "description": condition, "icon": "01d"}],
+        "base": "stations",
+        "main": {"temp": round(temp, 2), "feels_like": round(temp - 1.3, 2), "temp_min": round(temp - 2, 2),
+                 "temp_max": round(temp + 2, 2), "pressure": r.randint(990, 1030), "humidity": r.randint(20, 95)},
+        "visibility": 10000,
+        "wind": {"speed": round(r.uniform(0, 12), 2), "deg": r.randint(0, 359)},
+        "clouds": {"all": r.randint(0, 100)},
+        "dt": int(datetime.now(timezone.utc).timestamp()),
+        "sys": {"country": "XX", "sunrise": 0, "sunset": 0},
+        "timezone": 0,
+        "id": r.randint(100000, 999999),
+        "name": city.title(),
+        "cod": 200,
+    })
+
+
+# ---------- OpenTripMap ----------
+async def opentripmap_geoname(request):
+    await request.app["behaviour"]["opentripmap"].apply()
+    name = request.query.get("name", "")
+    if not name:
+        return web.json_response({"error": "Parameter name is required"}, status=400)
+    lat, lon = _city_coords(name)
+    r = _rng("pop", name)
+    return web.json_response({"name": name.title(), "country": "XX", "lat": lat, "lon": lon,
+                              "population": r.randint(50_000, 12_000_000), "timezone": "UTC", "status": "OK"})
+
+
+async def opentripmap_radius(request):
+    await request.app["behaviour"]["opentripmap"].apply()
+    q = request.query
+    lat, lon = float(q.get("lat", 0)), float(q.get("lon", 0))
+    radius = float(q.get("radius", 1000))
+    limit = int(q.get("limit", 500))
+    r = _rng("places", round(lat, 3), round(lon, 3), radius)
+    total = r.randint(150, 2500)
+    features = []
+    for i in range(min(total, limit)):
+        pr = _rng("place", round(lat, 3), round(lon, 3), i)
+        dist = radius * math.sqrt(pr.random())
+        bearing = pr.uniform(0, 2 * math.pi)
+        dlat = dist * math.cos(bearing) / 111_320
+        dlon = dist * math.sin(bearing) / (111_320 * max(0.1, math.cos(math.radians(lat))))
+        features.append({
+            "type": "Feature",
+            "id": f"{i}",
+            "geometry": {"type": "Point", "coordinates": [lon + dlon, lat + dlat]},
+            "properties": {
+                "xid": f"N{pr.randint(10**8, 10**9)}",
+                "name": f"{pr.choice(['Old', 'Grand', 'Royal', 'St.', 'City', 'National'])} "
+                        f"{pr.choice(['Museum', 'Cathedral', 'Park', 'Tower', 'Market', 'Gallery', 'Palace', 'Bridge'])} {i}",
+                "dist": round(dist, 1),
+                "rate": pr.randint(1, 7),
+                "kinds": ",".join(pr.sample(KINDS, 2)) + ",interesting_places",
+            },
+        })
+    return web.json_response({"type": "FeatureCollection", "features": features})
+
+
+def create_app(behaviour: dict[str, UpstreamBehaviour] | None = None) -> web.Application:
+    app = web.Application()
+    app["behaviour"] = behaviour or {name: UpstreamBehaviour() for name in UPSTREAMS}
+    app.router.add_post("/amadeus/v1/security/oauth2/token", amadeus_token)
+    app.router.add_get("/amadeus/v2/shopping/flight-offers", amadeus_offers)
+    app.router.add_get("/openweather/data/2.5/weather", openweather_current)
+    app.router.add_get("/opentripmap/0.1/en/places/geoname", opentripmap_geoname)
+    app.router.add_get("/opentripmap/0.1/en/places/radius", opentripmap_radius)
+    return app
+
+
+def base_urls(host: str, port: int) -> dict[str, str]:
+    """Environment variables that point travel_server.py at a stub on host:port."""
+    root = f"http://{host}:{port}"
+    return {
+        "AMADEUS_BASE_URL": f"{root}/amadeus",
+        "OPENWEATHER_BASE_URL": f"{root}/openweather",
+        "OPENTRIPMAP_BASE_URL": f"{root}/opentripmap/0.1/en",
+    }
+
+
+async def start_stub(host: str = "127.0.0.1", port: int = 8900,
+                     behaviour: dict[str, UpstreamBehaviour] | None = None) -> web.AppRunner:
+    runner = web.AppRunner(create_app(behaviour), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def behaviour_from_args(args) -> dict[str, UpstreamBehaviour]:
+    """Global --latency-ms/--jitter-ms/--error-rate with optional per-upstream name=value overrides."""
+    def overrides(items):
+        return {k: float(v) for k, v in (item.split("=", 1) for item in items or [])}
+
+    latency, jitter, errors = overrides(args.latency), overrides(args.jitter), overrides(args.errors)
+    return {
+        name: UpstreamBehaviour(latency.get(name, args.latency_ms), jitter.get(name, args.jitter_ms),
+                                errors.get(name, args.error_rate))
+        for name in UPSTREAMS
+    }
+
+
+def add_behaviour_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--latency", nargs="*", metavar="UPSTREAM=MS", help="per-upstream latency, e.g. amadeus=300")
+    parser.add_argument("--jitter", nargs="*", metavar="UPSTREAM=MS")
+    parser.add_argument("--errors", nargs="*", metavar="UPSTREAM=RATE", help="per-upstream error rate, e.g. opentripmap=0.05")
+
+
+async def _serve(host: str, port: int, behaviour):
+    runner = await start_stub(host, port, behaviour)
+    print(f"✅ Stub upstreams on http://{host}:{port}")
+    for key, value in base_urls(host, port).items():
+        print(f"   {key}={value}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline stand-ins for the travel APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_behaviour_args(parser)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args.host, args.port, behaviour_from_args(args)))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Flight offer table for multi-route / multi-date searches
+- Flattens Amadeus flight-offers payloads into compact FlightOffer rows
+- Filters by carrier, departure time and stops
+- Ranks the top N by price, total duration or number of stops
+"""
+
+import heapq
+import re
+from dataclasses import dataclass, asdict
+from datetime import date, timedelta
+
+SORT_KEYS = {
+    "price": lambda o: (o.price, o.duration_min, o.stops),
+    "duration": lambda o: (o.duration_min, o.price, o.stops),
+    "stops": lambda o: (o.stops, o.price, o.duration_min),
+}
+
+_DURATION = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?")
+_HHMM = re.compile(r"(?:[01]\d|2[0-3]):[0-5]\d")
+
+
+@dataclass(slots=True)
+class FlightOffer:
+    origin: str
+    destination: str
+    date: str
+    carrier: str
+    price: float
+    currency: str
+    duration_min: int
+    stops: int
+    departure: str
+    arrival: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def parse_duration(value: str) -> int:
+    """ISO-8601 duration such as "PT2H10M" or "P1DT3H" in minutes."""
+    match = _DURATION.fullmatch(value or "")
+    if not match:
+        return 0
+    days, hours, minutes = (int(g or 0) for g in match.groups())
+    return days * 1440 + hours * 60 + minutes
+
+
+def _window(date_from: str, date_to: str | None) -> tuple[date, date]:
+    start = date.fromisoformat(date_from)
+    end = date.fromisoformat(date_to) if date_to else start
+    if end < start:
+        raise ValueError(f"date_to {date_to} is before date_from {date_from}")
+    return start, end
+
+
+def window_days(date_from: str, date_to: str | None = None) -> int:
+    """How many dates date_window() returns, without building the list."""
+    start, end = _window(date_from, date_to)
+    return (end - start).days + 1
+
+
+def date_window(date_from: str, date_to: str | None = None) -> list[str]:
+    """Every ISO date from date_from to date_to inclusive."""
+    start, end = _window(date_from, date_to)
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+def check_filters(sort_by: str = "price", depart_after: str | None = None, depart_before: str | None = None):
+    """Reject a sort key or departure bound rank_offers() cannot use, before any search runs."""
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"sort_by must be one of {', '.join(SORT_KEYS)}")
+    for name, value in (("depart_after", depart_after), ("depart_before", depart_before)):
+        if value is not None and not _HHMM.fullmatch(value):
+            raise ValueError(f"{name} must be a 24-hour HH:MM time such as 07:30, got {value!r}")
+
+
+def parse_offers(data: dict, origin: str, destination: str, day: str) -> list[FlightOffer]:
+    """Flatten the outbound itinerary of every offer in a flight-offers response."""
+    rows = []
+    for offer in data.get("data", []):
+        try:
+            itinerary = offer["itineraries"][0]
+            segments = itinerary["segments"]
+            rows.append(FlightOffer(
+                origin=origin,
+                destination=destination,
+                date=day,
+                carrier=(offer.get("validatingAirlineCodes") or [segments[0]["carrierCode"]])[0],
+                price=float(offer["price"]["total"]),
+                currency=offer["price"].get("currency", ""),
+                duration_min=parse_duration(itinerary.get("duration", "")),
+                stops=len(segments) - 1,
+                departure=segments[0]["departure"]["at"],
+                arrival=segments[-1]["arrival"]["at"],
+            ))
+        except (KeyError, IndexError, TypeError, ValueError):
+            continue  # skip malformed offers rather than failing the whole search
+    return rows
+
+
+def rank_offers(offers, sort_by: str = "price", top_n: int = 5, carriers=None,
+                depart_after: str | None = None, depart_before: str | None = None,
+                max_stops: int | None = None) -> list[FlightOffer]:
+    """
+    Top `top_n` offers by `sort_by` ("price", "duration" or "stops").
+    depart_after / depart_before are "HH:MM" bounds on the local departure time.
+    """
+    check_filters(sort_by, depart_after, depart_before)
+    wanted = {c.upper() for c in carriers} if carriers else None
+
+    def keep(o: FlightOffer) -> bool:
+        hhmm = o.departure[11:16]
+        return ((wanted is None or o.carrier in wanted)
+                and (depart_after is None or hhmm >= depart_after)
+                and (depart_before is None or hhmm <= depart_before)
+                and (max_stops is None or o.stops <= max_stops))
+
+    return heapq.nsmallest(top_n, filter(keep, offers), key=SORT_KEYS[sort_by])
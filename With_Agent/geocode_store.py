@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Persistent geocode index for OpenTripMap city lookups
+- SQLite in WAL mode, so several server processes can read it concurrently
+- In-process LRU in front of the database
+- Misses fall through to the API and are written back; the server waits at
+  most `busy_timeout` for another process's write lock and otherwise keeps
+  the result in memory only, so the event loop never stalls on SQLite
+- Bulk pre-warm from a list of city names:
+    python geocode_store.py prewarm cities.txt
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+from ttl_cache import normalize_city
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocode (
+    city TEXT PRIMARY KEY,
+    name TEXT,
+    country TEXT,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class GeocodeStore:
+    def __init__(self, path: str = "geocode.sqlite3", lru_size: int = 4096, busy_timeout: float = 0.05):
+        self.path = path
+        self.lru_size = lru_size
+        self.busy_timeout = busy_timeout
+        self._lru: OrderedDict[str, dict] = OrderedDict()
+        self._conn = None
+        self.lru_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.skipped_writes = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, geo: dict):
+        self._lru[key] = geo
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get(self, city: str) -> dict | None:
+        """Cached geoname payload ({"name", "country", "lat", "lon"}) or None."""
+        key = normalize_city(city)
+        geo = self._lru.get(key)
+        if geo is not None:
+            self._lru.move_to_end(key)
+            self.lru_hits += 1
+            return geo
+        row = self._db().execute(
+            "SELECT name, country, lat, lon FROM geocode WHERE city = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.db_hits += 1
+        geo = {"name": row[0], "country": row[1], "lat": row[2], "lon": row[3]}
+        self._remember(key, geo)
+        return geo
+
+    def put(self, city: str, geo: dict) -> bool:
+        """Store a payload; False when another process held the write lock past `busy_timeout`."""
+        key = normalize_city(city)
+        geo = {"name": geo.get("name"), "country": geo.get("country"), "lat": geo["lat"], "lon": geo["lon"]}
+        self._remember(key, geo)
+        conn = self._db()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode (city, name, country, lat, lon, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, geo["name"], geo["country"], geo["lat"], geo["lon"], time.time()),
+            )
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            conn.rollback()
+            self.skipped_writes += 1  # a later miss in any process writes it back
+            return False
+        return True
+
+    async def resolve(self, city: str, fetch) -> dict:
+        """
+        Return the geoname payload for `city`, calling `fetch(city)` on a miss.
+        Payloads without coordinates (API errors) are returned but not stored.
+        """
+        geo = self.get(city)
+        if geo is not None:
+            return geo
+        self.misses += 1
+        geo = await fetch(city)
+        if "lat" in geo and "lon" in geo:
+            self.put(city, geo)
+        return geo
+
+    async def prewarm(self, cities, fetch, concurrency: int = 4) -> dict:
+        """Resolve every city not yet stored, at most `concurrency` at a time."""
+        semaphore = asyncio.Semaphore(concurrency)
+        summary = {"cached": 0, "fetched": 0, "failed": []}
+
+        async def warm(city):
+            if self.get(city) is not None:
+                summary["cached"] += 1
+                return
+            async with semaphore:
+                try:
+                    geo = await self.resolve(city, fetch)
+                except Exception as e:
+                    geo = {"error": str(e)}
+            if "lat" in geo:
+                summary["fetched"] += 1
+            else:
+                summary["failed"].append(city)
+
+        unique = {normalize_city(c): c for c in cities}
+        await asyncio.gather(*(warm(c) for c in unique.values()))
+        return summary
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def stats(self) -> dict:
+        return {
+            "lru_size": len(self._lru),
+            "lru_hits": self.lru_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "skipped_writes": self.skipped_writes,
+        }
+
+
+async def _prewarm_main(path: str, concurrency: int):
+    # Reuse the server's store, pooled session and OpenTripMap fetcher
+    from travel_server import geocode_store, fetch_geoname, http_pool
+    from rate_limiter import lane
+
+    geocode_store.busy_timeout = 5.0  # writing is this command's job: wait for the server's writes
+    with open(path, encoding="utf-8") as f:
+        cities = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    try:
+        # Own process and rate limiter: the lane only orders these requests among themselves.
+        # Run it while the server is idle, or lower RATE_LIMIT_* so both fit the quota.
+        with lane("batch"):
+            summary = await geocode_store.prewarm(cities, fetch_geoname, concurrency)
+    finally:
+        await http_pool.close()
+        geocode_store.close()
+    print(f"✅ Pre-warmed {len(cities)} cities: {summary['cached']} already cached, "
+          f"{summary['fetched']} fetched, {len(summary['failed'])} failed")
+    for city in summary["failed"]:
+        print(f"❌ {city}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Geocode index maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    warm = sub.add_parser("prewarm", help="Fill the index from a file with one city per line")
+    warm.add_argument("cities_file")
+    warm.add_argument("--concurrency", type=int, default=int(os.getenv("GEOCODE_PREWARM_CONCURRENCY", "4")))
+    args = parser.parse_args()
+    asyncio.run(_prewarm_main(args.cities_file, args.concurrency))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP connection pools for the Travel MCP Server
+- One long-lived aiohttp.ClientSession per upstream (Amadeus, OpenWeather, OpenTripMap)
+- Keep-alive, DNS caching and per-host connection limits
+- Pool sizes configurable through environment variables; timeouts are set
+  per request from the UPSTREAM_* policy (resilience.py)
+- aiohttp is imported in the background at startup (sessions open on first
+  use), so the server answers `initialize` without waiting for it
+"""
+
+import asyncio
+import importlib
+import os
+
+UPSTREAMS = ("amadeus", "openweather", "opentripmap")
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name, "")
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name, "")
+    return int(value) if value else default
+
+
+class UpstreamPool:
+    """Owns one pooled ClientSession per upstream for the lifetime of the server."""
+
+    def __init__(self, upstreams=UPSTREAMS):
+        self.upstreams = tuple(upstreams)
+        self.limit = _env_int("HTTP_POOL_LIMIT", 100)
+        self.limit_per_host = _env_int("HTTP_POOL_LIMIT_PER_HOST", 20)
+        self.dns_ttl = _env_int("HTTP_DNS_TTL", 300)
+        self.keepalive = _env_float("HTTP_KEEPALIVE_TIMEOUT", 30.0)
+        self._sessions = {}
+        self._warmup = None
+
+    def _new_session(self):
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_ttl,
+            keepalive_timeout=self.keepalive,
+        )
+        return aiohttp.ClientSession(connector=connector)
+
+    async def start(self):
+        """Import aiohttp off the event loop (called once at server startup)."""
+        self._warmup = asyncio.ensure_future(asyncio.to_thread(importlib.import_module, "aiohttp"))
+
+    def session(self, name: str):
+        """Return the pooled session for an upstream, creating it on first use."""
+        if name not in self.upstreams:
+            raise KeyError(f"Unknown upstream: {name}")
+        session = self._sessions.get(name)
+        if session is None or session.closed:
+            session = self._sessions[name] = self._new_session()
+        return session
+
+    async def close(self):
+        """Close every session and its connector (called at server shutdown)."""
+        if self._warmup is not None:
+            await asyncio.gather(self._warmup, return_exceptions=True)
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            await session.close()
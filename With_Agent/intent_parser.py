@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Deterministic fast path for the agent planner
+- parse_intent() turns common query shapes ("weather in Tokyo",
+  "flights DEL to BOM on 2026-11-02", "flights from New York to London on
+  2026-11-02", "3 day itinerary for Rome", "plan a trip from DEL to Paris
+  on 2026-11-02 for 4 days")
+  into the same {"tool", "arguments"} plan Gemini would return
+- PlanCache is an LRU from normalized query text to plan, keyed on the
+  tool-list version, for queries the fast path does not understand
+"""
+
+import copy
+import re
+from collections import OrderedDict
+
+_CITY = r"[^\W\d_][^\W\d_ .'-]*(?:[ .'-]+[^\W\d_]+)*?"
+_ISO_DATE = r"\d{4}-\d{2}-\d{2}"
+_DAYS = r"[1-9]\d?"  # 1-99: "for 0 days" is not a plan
+
+WEATHER = re.compile(
+    rf"^(?:what(?:'s| is) the |how is the |show (?:me )?the |get (?:the )?)?(?:current )?weather "
+    rf"(?:like )?(?:in|for|at) (?P<cities>{_CITY}(?:(?:,| and| &) ?{_CITY})*)(?: (?:today|now|right now))?$",
+    re.IGNORECASE,
+)
+FLIGHTS = re.compile(
+    rf"^(?:find |search |show (?:me )?|get )?(?:cheap(?:est)? )?flights? (?:from )?(?P<origin>{_CITY}) "
+    rf"(?:to|->|→) (?P<destination>{_CITY}) (?:on |for )?(?P<date>{_ISO_DATE})$",
+    re.IGNORECASE,
+)
+ITINERARY = re.compile(
+    rf"^(?:(?:make|create|generate|plan|build) (?:me )?(?:an? )?)?(?:(?P<days>{_DAYS})[- ]days? )?"
+    rf"(?:itinerary|trip plan) (?:for|in|to) (?P<city>{_CITY})(?: for (?P<days2>{_DAYS}) days?)?$",
+    re.IGNORECASE,
+)
+TRIP = re.compile(
+    rf"^(?:plan|book|organi[sz]e|arrange) (?:me )?(?:an? )?(?:(?P<days>{_DAYS})[- ]days? )?trip "
+    rf"from (?P<origin>{_CITY}) to (?P<city>{_CITY}) (?:on |for )?(?P<date>{_ISO_DATE})"
+    rf"(?: for (?P<days2>{_DAYS}) days?)?$",
+    re.IGNORECASE,
+)
+_SPLIT_CITIES = re.compile(r"\s*(?:,|\band\b|&)\s*", re.IGNORECASE)
+
+# Words that mean a "city" capture is really a compound or time-shifted query
+_NOT_A_CITY = re.compile(
+    r"\b(flights?|weather|itinerary|hotels?|trip|tomorrow|tonight|week|weekend|next|forecast|days?|from|to)\b",
+    re.IGNORECASE,
+)
+
+# Queries that lean on conversation context must not be answered from the cache
+_CONTEXTUAL = re.compile(r"\b(there|it|that|those|them|same|again|also|previous|last|instead)\b", re.IGNORECASE)
+
+
+def _place(text: str) -> str:
+    """IATA codes upper-cased, city names as typed (the server resolves both)."""
+    text = text.strip()
+    return text.upper() if len(text) == 3 else text
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.casefold().strip().rstrip("?.!").split())
+
+
+def parse_intent(query: str, tool_names) -> list[dict] | None:
+    """Plan for a simple query, or None when it needs the LLM."""
+    text = " ".join(query.strip().rstrip("?.!").split())
+
+    m = TRIP.match(text)
+    if m and "plan_trip" in tool_names and not _NOT_A_CITY.search(m.group("city") + " " + m.group("origin")):
+        days = m.group("days") or m.group("days2")
+        arguments = {"origin": _place(m.group("origin")), "destination_city": m.group("city").strip(),
+                     "date": m.group("date")}
+        if days:
+            arguments["days"] = int(days)
+        return [{"tool": "plan_trip", "arguments": arguments}]
+
+    m = WEATHER.match(text)
+    if m:
+        cities = [c.strip() for c in _SPLIT_CITIES.split(m.group("cities")) if c.strip()]
+        if any(_NOT_A_CITY.search(c) for c in cities):
+            return None
+        if len(cities) > 1 and "get_weather_batch" in tool_names:
+            return [{"tool": "get_weather_batch", "arguments": {"cities": cities}}]
+        if "get_weather" in tool_names:
+            return [{"tool": "get_weather", "arguments": {"city": c}} for c in cities]
+
+    m = FLIGHTS.match(text)
+    if m and "get_flight_details" in tool_names:
+        if _NOT_A_CITY.search(m.group("origin") + " " + m.group("destination")):
+            return None
+        return [{"tool": "get_flight_details", "arguments": {
+            "origin": _place(m.group("origin")),
+            "destination": _place(m.group("destination")),
+            "date": m.group("date"),
+        }}]
+
+    m = ITINERARY.match(text)
+    if m and "generate_itinerary_pdf" in tool_names:
+        if _NOT_A_CITY.search(m.group("city")):
+            return None
+        days = m.group("days") or m.group("days2")
+        arguments = {"city": m.group("city").strip()}
+        if days:
+            arguments["days"] = int(days)
+        return [{"tool": "generate_itinerary_pdf", "arguments": arguments}]
+
+    return None
+
+
+class PlanCache:
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._plans: OrderedDict[tuple[int, str], list[dict]] = OrderedDict()
+        self.fast_path = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cacheable(query: str) -> bool:
+        return not _CONTEXTUAL.search(query)
+
+    def get(self, version: int, query: str) -> list[dict] | None:
+        key = (version, normalize_query(query))
+        plan = self._plans.get(key) if self.cacheable(query) else None
+        if plan is None:
+            self.misses += 1
+            return None
+        self._plans.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(plan)
+
+    def put(self, version: int, query: str, plan: list[dict]):
+        if not plan or not self.cacheable(query):
+            return
+        key = (version, normalize_query(query))
+        self._plans[key] = copy.deepcopy(plan)
+        self._plans.move_to_end(key)
+        while len(self._plans) > self.maxsize:
+            self._plans.popitem(last=False)
+
+    def report(self) -> str:
+        total = self.fast_path + self.hits + self.misses
+        if not total:
+            return "No queries planned."
+        pct = lambda n: f"{100 * n / total:.0f}%"
+        return (f"Planned {total} queries: fast path {pct(self.fast_path)}, "
+                f"plan cache {pct(self.hits)}, Gemini {pct(self.misses)}")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Multi-day itinerary planning over OpenTripMap places
+- Haversine distances computed as whole NumPy matrices (no Python loop over pairs)
+- Balanced k-means splits the candidates into `days` geographically compact groups
+- Each day keeps its best-rated places and visits them in nearest-neighbour
+  order improved by 2-opt, starting from the city centre
+"""
+
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+# Groups may exceed an even split by this factor before points spill to their next-nearest centre
+BALANCE_SLACK = 1.2
+
+
+def haversine_matrix(lat, lon, lat2=None, lon2=None) -> np.ndarray:
+    """Great-circle distances in km from every (lat, lon) to every (lat2, lon2); defaults to all pairs."""
+    lat1 = np.radians(np.asarray(lat, dtype=np.float64))[:, None]
+    lon1 = np.radians(np.asarray(lon, dtype=np.float64))[:, None]
+    if lat2 is None:
+        lat2, lon2 = lat1.T, lon1.T
+    else:
+        lat2 = np.radians(np.asarray(lat2, dtype=np.float64))[None, :]
+        lon2 = np.radians(np.asarray(lon2, dtype=np.float64))[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _balanced_assign(dist: np.ndarray, capacity: int) -> np.ndarray:
+    """Nearest centre per point, capped at `capacity` points per centre; points with the most to lose choose first."""
+    n, k = dist.shape
+    preference = np.argsort(dist, axis=1)
+    ordered = np.sort(dist, axis=1)
+    regret = ordered[:, 1] - ordered[:, 0] if k > 1 else np.zeros(n)
+    labels = np.empty(n, dtype=np.int64)
+    room = np.full(k, capacity)
+    for i in np.argsort(-regret, kind="stable"):
+        for c in preference[i]:
+            if room[c]:
+                room[c] -= 1
+                labels[i] = c
+                break
+    return labels
+
+
+def cluster(lat, lon, k: int, iterations: int = 25, seed: int = 0) -> np.ndarray:
+    """Group label (0..k-1) per point from balanced k-means with k-means++ seeding (deterministic per seed)."""
+    lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+    n = len(lat)
+    k = max(1, min(k, n))
+    rng = np.random.default_rng(seed)
+
+    centres = [int(rng.integers(n))]
+    nearest = haversine_matrix(lat, lon, lat[centres], lon[centres])[:, 0]
+    for _ in range(1, k):
+        weights = nearest ** 2
+        total = weights.sum()
+        pick = int(rng.choice(n, p=weights / total)) if total > 0 else int(rng.integers(n))
+        centres.append(pick)
+        nearest = np.minimum(nearest, haversine_matrix(lat, lon, lat[[pick]], lon[[pick]])[:, 0])
+    c_lat, c_lon = lat[centres], lon[centres]
+
+    capacity = math.ceil(n / k * BALANCE_SLACK)
+    labels = None
+    for _ in range(iterations):
+        new = _balanced_assign(haversine_matrix(lat, lon, c_lat, c_lon), capacity)
+        if labels is not None and np.array_equal(new, labels):
+            break
+        labels = new
+        counts = np.bincount(labels, minlength=k)
+        filled = counts > 0
+        # Plain coordinate means are accurate enough at city scale
+        c_lat[filled] = (np.bincount(labels, weights=lat, minlength=k) / np.maximum(counts, 1))[filled]
+        c_lon[filled] = (np.bincount(labels, weights=lon, minlength=k) / np.maximum(counts, 1))[filled]
+    return labels
+
+
+def nearest_neighbour_route(dist: np.ndarray, start: int = 0) -> np.ndarray:
+    """Open path from `start` that always moves to the closest unvisited point."""
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    route = np.empty(n, dtype=np.int64)
+    current = route[0] = start
+    visited[start] = True
+    for step in range(1, n):
+        current = int(np.argmin(np.where(visited, np.inf, dist[current])))
+        route[step] = current
+        visited[current] = True
+    return route
+
+
+def two_opt(route: np.ndarray, dist: np.ndarray, max_passes: int = 50) -> np.ndarray:
+    """
+    Shorten an open path by reversing segments; route[0] stays fixed. For each
+    edge all reversal end points are scored in one vectorized step.
+    """
+    route = np.array(route, dtype=np.int64)
+    n = len(route)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(n - 2):
+            a, b = route[i], route[i + 1]
+            ends = route[i + 2:]                       # reversing route[i+1..j] for each candidate j
+            after = np.append(route[i + 3:], -1)       # the point following j (-1: end of the path)
+            delta = dist[a, ends] - dist[a, b]
+            closed = after >= 0
+            delta[closed] += dist[b, after[closed]] - dist[ends[closed], after[closed]]
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                j += i + 2
+                route[i + 1:j + 1] = route[i + 1:j + 1][::-1].copy()
+                improved = True
+        if not improved:
+            break
+    return route
+
+
+def route_length(route, dist: np.ndarray) -> float:
+    route = np.asarray(route)
+    return float(dist[route[:-1], route[1:]].sum()) if len(route) > 1 else 0.0
+
+
+def plan_days(places: list[dict], days: int, centre: tuple[float, float],
+              per_day: int | None = None, seed: int = 0) -> list[dict]:
+    """
+    Split `places` (dicts with name, lat, lon and optional rate) into `days`
+    compact groups and order each as a walk from `centre`. Each day is
+    {"places": [names in visiting order], "distance_km": walk length}; days
+    closest to the centre come first, days without places are empty.
+    per_day keeps only the best-rated places of each group (None keeps all).
+    """
+    if days < 1:
+        raise ValueError(f"days must be at least 1, got {days}")
+    groups = []  # (mean distance from the centre, day)
+    if places:
+        lat = np.array([p["lat"] for p in places], dtype=np.float64)
+        lon = np.array([p["lon"] for p in places], dtype=np.float64)
+        rate = np.array([p.get("rate") or 0 for p in places], dtype=np.float64)
+        labels = cluster(lat, lon, days, seed=seed)
+        for group in range(labels.max() + 1):
+            members = np.flatnonzero(labels == group)
+            if per_day is not None and len(members) > per_day:
+                mid = haversine_matrix(lat[members], lon[members], [lat[members].mean()], [lon[members].mean()])[:, 0]
+                members = members[np.lexsort((mid, -rate[members]))[:per_day]]  # best rated, then most central
+            # Index 0 is the city centre, the fixed start of the walk
+            stop_lat = np.concatenate(([centre[0]], lat[members]))
+            stop_lon = np.concatenate(([centre[1]], lon[members]))
+            dist = haversine_matrix(stop_lat, stop_lon)
+            route = two_opt(nearest_neighbour_route(dist), dist)
+            groups.append((float(dist[0, 1:].mean()), {
+                "places": [places[members[i - 1]]["name"] for i in route[1:]],
+                "distance_km": round(route_length(route, dist), 2),
+            }))
+    schedule = [day for _, day in sorted(groups, key=lambda g: g[0])]
+    schedule += [{"places": [], "distance_km": 0.0} for _ in range(days - len(schedule))]
+    return schedule
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Low-overhead latency instrumentation for the Travel MCP Server
+- Per-tool and per-operation (upstream HTTP call, ReportLab build) latency
+  histograms, in-flight gauges, error counters and payload sizes
+- Cache and pool statistics pulled from registered collectors at read time
+- Snapshot as a dict (get_server_stats tool) or Prometheus text format
+"""
+
+import functools
+import time
+from bisect import bisect_left
+from collections import deque
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Cumulative-bucket histogram plus a small reservoir of recent samples for quantiles."""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "recent")
+
+    def __init__(self, buckets=LATENCY_BUCKETS, reservoir: int = 512):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=reservoir)
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self, scale: float = 1000.0, digits: int = 1) -> dict:
+        return {
+            "count": self.count,
+            "avg": round(self.sum / self.count * scale, digits) if self.count else 0.0,
+            "p50": round(self.quantile(0.50) * scale, digits),
+            "p95": round(self.quantile(0.95) * scale, digits),
+            "p99": round(self.quantile(0.99) * scale, digits),
+        }
+
+
+class Series:
+    """Latency, in-flight, error and payload-size state for one tool or operation."""
+
+    __slots__ = ("latency", "sizes", "in_flight", "errors")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.sizes = Histogram(SIZE_BUCKETS)
+        self.in_flight = 0
+        self.errors = 0
+
+
+class Span:
+    __slots__ = ("series", "started", "size", "error")
+
+    def __init__(self, series: Series):
+        self.series = series
+        self.size = None
+        self.error = False
+
+    def __enter__(self):
+        self.series.in_flight += 1
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        series = self.series
+        series.latency.observe(time.perf_counter() - self.started)
+        series.in_flight -= 1
+        if exc_type is not None or self.error:
+            series.errors += 1
+        if self.size is not None:
+            series.sizes.observe(self.size)
+        return False
+
+
+class Metrics:
+    def __init__(self, namespace: str = "travel"):
+        self.namespace = namespace
+        self.tools: dict[str, Series] = {}
+        self.operations: dict[tuple[str, str], Series] = {}
+        self.collectors = {}
+        self.started = time.time()
+
+    def tool_span(self, tool: str) -> Span:
+        series = self.tools.get(tool)
+        if series is None:
+            series = self.tools[tool] = Series()
+        return Span(series)
+
+    def span(self, component: str, operation: str) -> Span:
+        """Time one upstream call or internal stage, e.g. span("openweather", "weather")."""
+        key = (component, operation)
+        series = self.operations.get(key)
+        if series is None:
+            series = self.operations[key] = Series()
+        return Span(series)
+
+    def operation_quantile(self, component: str, operation: str, q: float, min_count: int = 1) -> float | None:
+        """Recent latency quantile in seconds, or None until `min_count` samples exist."""
+        series = self.operations.get((component, operation))
+        if series is None or series.latency.count < min_count:
+            return None
+        return series.latency.quantile(q)
+
+    def instrument(self, is_error=None):
+        """Decorator for async tools; `is_error(result)` flags error replies that did not raise."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                with self.tool_span(fn.__name__) as span:
+                    result = await fn(*args, **kwargs)
+                    if is_error is not None and is_error(result):
+                        span.error = True
+                    return result
+            return wrapper
+        return decorate
+
+    def register(self, name: str, collector):
+        """Add a zero-argument callable returning a dict of numbers (cache or pool stats)."""
+        self.collectors[name] = collector
+
+    def snapshot(self) -> dict:
+        def series_dict(s: Series) -> dict:
+            d = {"latency_ms": s.latency.summary(), "in_flight": s.in_flight, "errors": s.errors}
+            if s.sizes.count:
+                d["payload_bytes"] = s.sizes.summary(scale=1, digits=0)
+            return d
+
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "tools": {name: series_dict(s) for name, s in sorted(self.tools.items())},
+            "operations": {f"{c}.{o}": series_dict(s) for (c, o), s in sorted(self.operations.items())},
+            **{name: collect() for name, collect in self.collectors.items()},
+        }
+
+    def prometheus(self) -> str:
+        ns = self.namespace
+        lines = []
+
+        def histogram(name: str, help_text: str, items, labels_of):
+            lines.append(f"# HELP {ns}_{name} {help_text}")
+            lines.append(f"# TYPE {ns}_{name} histogram")
+            for key, hist in items:
+                labels = labels_of(key)
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f'{ns}_{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{ns}_{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+                lines.append(f"{ns}_{name}_sum{{{labels}}} {hist.sum}")
+                lines.append(f"{ns}_{name}_count{{{labels}}} {hist.count}")
+
+        def simple(name: str, kind: str, help_text: str, items, labels_of):
+            lines.append(f"# HELP {ns}_{name} {help_text}")
+            lines.append(f"# TYPE {ns}_{name} {kind}")
+            for key, value in items:
+                lines.append(f"{ns}_{name}{{{labels_of(key)}}} {value}")
+
+        tool_label = lambda t: f'tool="{t}"'
+        op_label = lambda k: f'component="{k[0]}",operation="{k[1]}"'
+        tools, ops = sorted(self.tools.items()), sorted(self.operations.items())
+
+        histogram("tool_latency_seconds", "MCP tool latency", [(k, s.latency) for k, s in tools], tool_label)
+        simple("tool_in_flight", "gauge", "MCP tool calls in progress", [(k, s.in_flight) for k, s in tools], tool_label)
+        simple("tool_errors_total", "counter", "MCP tool calls that failed", [(k, s.errors) for k, s in tools], tool_label)
+        histogram("operation_latency_seconds", "Upstream call / internal stage latency",
+                  [(k, s.latency) for k, s in ops], op_label)
+        simple("operation_in_flight", "gauge", "Operations in progress", [(k, s.in_flight) for k, s in ops], op_label)
+        simple("operation_errors_total", "counter", "Operations that failed", [(k, s.errors) for k, s in ops], op_label)
+        histogram("operation_payload_bytes", "Upstream response size",
+                  [(k, s.sizes) for k, s in ops if s.sizes.count], op_label)
+
+        for name, collect in self.collectors.items():
+            for key, value in collect().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"{ns}_{name}_{key} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Itinerary PDF rendering off the event loop
+- ReportLab builds run in a thread or process pool (PDF_POOL_KIND)
+- Bounded queue: callers wait up to PDF_QUEUE_WAIT seconds for a slot,
+  then get a fast RenderPoolBusy error instead of piling up. A slot is held
+  until the job itself finishes, even if its caller was cancelled
+- A cancelled caller whose job already runs waits for it to finish before
+  the cancellation propagates, so it can clean up the job's output file
+- Queue depth, queue wait and render-time metrics
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+# Bump whenever the PDF layout changes so stored artifacts are re-rendered
+ITINERARY_TEMPLATE_VERSION = "2"
+
+
+class RenderPoolBusy(Exception):
+    """Raised when the render queue is full."""
+
+
+def render_itinerary_pdf(pdf_path: str, city: str, days: int, schedule: list[dict]) -> str:
+    """Build the itinerary PDF synchronously (runs inside a pool worker); one schedule entry per day."""
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.pagesizes import A4
+
+    doc = SimpleDocTemplate(pdf_path, pagesize=A4)
+    styles = getSampleStyleSheet()
+    story = [Paragraph(f"Itinerary for {city} ({days} days)", styles["Title"]), Spacer(1, 12)]
+    for day, plan in enumerate(schedule, 1):
+        stops = plan["places"]
+        heading = (f"Day {day}: {len(stops)} stops, about {plan['distance_km']:.1f} km walk from the city centre"
+                   if stops else f"Day {day}: free day")
+        story.append(Paragraph(heading, styles["Heading2"]))
+        for stop, attraction in enumerate(stops, 1):
+            story.append(Paragraph(f"{stop}. {attraction}", styles["Normal"]))
+        story.append(Spacer(1, 12))
+    doc.build(story)
+    return pdf_path
+
+
+def _timed(fn, *args):
+    started = time.time()
+    result = fn(*args)
+    return result, started, time.time() - started
+
+
+def _percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RenderPool:
+    def __init__(self, kind: str | None = None, workers: int | None = None,
+                 queue_size: int | None = None, queue_wait: float | None = None):
+        self.kind = kind or os.getenv("PDF_POOL_KIND", "thread")
+        self.workers = workers or int(os.getenv("PDF_POOL_WORKERS", "2"))
+        # Jobs allowed in the pool at once (running + waiting for a worker)
+        self.queue_size = queue_size or int(os.getenv("PDF_QUEUE_SIZE", "8"))
+        # Seconds a caller may wait for a free slot before RenderPoolBusy (0 = fail fast)
+        self.queue_wait = float(os.getenv("PDF_QUEUE_WAIT", "2")) if queue_wait is None else queue_wait
+        self._executor = None
+        self._slots = asyncio.Semaphore(self.queue_size)
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.render_times = deque(maxlen=1024)
+        self.queue_waits = deque(maxlen=1024)
+
+    def _pool(self):
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pdf")
+        return self._executor
+
+    async def submit(self, fn, *args):
+        """Run fn(*args) in the pool; raise RenderPoolBusy if no slot frees up in time."""
+        try:
+            if self.queue_wait > 0:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_wait)
+            elif self._slots.locked():
+                raise asyncio.TimeoutError
+            else:
+                await self._slots.acquire()
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise RenderPoolBusy(f"{self.pending} itineraries already rendering or queued") from None
+
+        self.pending += 1
+        submitted = time.time()
+        loop = asyncio.get_running_loop()
+        try:
+            job = self._pool().submit(_timed, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # A running worker cannot be interrupted: the slot is freed when the job ends, not the caller
+        job.add_done_callback(lambda _: self._release_from_worker(loop))
+        try:
+            result, started, elapsed = await asyncio.wrap_future(job)
+        except asyncio.CancelledError:
+            if not job.cancel() and not job.done():
+                await asyncio.gather(asyncio.wrap_future(job), return_exceptions=True)
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        self.completed += 1
+        self.queue_waits.append(max(0.0, started - submitted))
+        self.render_times.append(elapsed)
+        return result
+
+    def _release(self):
+        self.pending -= 1
+        self._slots.release()
+
+    def _release_from_worker(self, loop: asyncio.AbstractEventLoop):
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            pass  # event loop already closed (shutdown)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queue_depth": max(0, self.pending - self.workers),
+            "in_flight": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "render_ms_p50": round(_percentile(self.render_times, 0.50) * 1000, 1),
+            "render_ms_p95": round(_percentile(self.render_times, 0.95) * 1000, 1),
+            "queue_wait_ms_p95": round(_percentile(self.queue_waits, 0.95) * 1000, 1),
+        }
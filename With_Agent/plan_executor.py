@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Dependency-aware executor for the agent's tool plan
+- Steps run concurrently unless one refers to another step's output,
+  either with "depends_on": [<step numbers>] or a "{{stepN}}" placeholder
+  in its arguments (steps are numbered from 1)
+- A step that refers to itself, a later step or a step that does not exist
+  fails instead of running
+- Concurrency limit and per-step timeout
+- Results come back in plan order with per-step timings; callbacks report
+  each step as it completes and relay the server's progress notifications
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+
+STEP_REF = re.compile(r"\{\{\s*step\s*(\d+)\s*\}\}")
+
+
+@dataclass
+class StepResult:
+    index: int
+    tool: str
+    arguments: dict
+    text: str = ""
+    ok: bool = False
+    started: float = 0.0  # seconds after the plan started
+    elapsed: float = 0.0
+
+
+def result_text(result) -> str:
+    """Clean text from a CallToolResult (no JSON blobs)."""
+    if hasattr(result, "content"):
+        texts = [c.text for c in result.content if hasattr(c, "text")]
+        return "\n".join(texts) if texts else str(result)
+    return str(result)
+
+
+def _refs(value) -> set[int]:
+    if isinstance(value, str):
+        return {int(n) - 1 for n in STEP_REF.findall(value)}
+    if isinstance(value, dict):
+        return set().union(*(_refs(v) for v in value.values())) if value else set()
+    if isinstance(value, list):
+        return set().union(*(_refs(v) for v in value)) if value else set()
+    return set()
+
+
+def _substitute(value, outputs: dict[int, str]):
+    if isinstance(value, str):
+        whole = STEP_REF.fullmatch(value.strip())
+        if whole:
+            return outputs[int(whole.group(1)) - 1]
+        return STEP_REF.sub(lambda m: outputs[int(m.group(1)) - 1], value)
+    if isinstance(value, dict):
+        return {k: _substitute(v, outputs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_substitute(v, outputs) for v in value]
+    return value
+
+
+def _wanted(step: dict) -> tuple[set[int], list]:
+    """Step indexes a step refers to, plus depends_on entries that are not step numbers."""
+    wanted, malformed = _refs(step.get("arguments", {})), []
+    depends_on = step.get("depends_on") or []
+    if not isinstance(depends_on, list):
+        depends_on = [depends_on]  # "depends_on": 1
+    for n in depends_on:
+        if isinstance(n, str) and n.strip().isdigit():
+            n = int(n)
+        if isinstance(n, int) and not isinstance(n, bool):
+            wanted.add(n - 1)
+        else:
+            malformed.append(n)
+    return wanted, malformed
+
+
+def dependencies(plan: list[dict]) -> list[set[int]]:
+    """Earlier steps each step depends on."""
+    return [{j for j in _wanted(step)[0] if 0 <= j < i} for i, step in enumerate(plan)]
+
+
+def invalid_references(plan: list[dict]) -> list[list]:
+    """Per step, what it refers to that is not an earlier step: itself, later or unknown steps, non-numbers."""
+    invalid = []
+    for i, step in enumerate(plan):
+        wanted, malformed = _wanted(step)
+        invalid.append(sorted(j + 1 for j in wanted if not 0 <= j < i) + malformed)
+    return invalid
+
+
+async def execute_plan(session, plan: list[dict], concurrency: int = 4,
+                       step_timeout: float = 60.0, on_step=None, on_progress=None,
+                       meta: dict | None = None) -> list[StepResult]:
+    """
+    Run every plan step as soon as the steps it depends on have finished.
+    `on_step(result)` is called as each step completes, and
+    `on_progress(result, progress, total, message)` for each progress
+    notification the server sends while the step is running. `meta` is sent
+    as the _meta of every tool call.
+    """
+    deps = dependencies(plan)
+    invalid = invalid_references(plan)
+    semaphore = asyncio.Semaphore(concurrency)
+    results = [StepResult(i, step.get("tool"), step.get("arguments", {}) or {}) for i, step in enumerate(plan)]
+    done = [asyncio.Event() for _ in plan]
+    t0 = time.perf_counter()
+
+    async def run(i: int):
+        res = results[i]
+        try:
+            if invalid[i]:
+                res.text = f"❌ Invalid step reference(s) {invalid[i]}: a step can only use earlier steps"
+                return
+            for j in sorted(deps[i]):
+                await done[j].wait()
+            failed = [j + 1 for j in deps[i] if not results[j].ok]
+            if failed:
+                res.text = f"❌ Skipped: depends on failed step(s) {failed}"
+                return
+            res.arguments = _substitute(res.arguments, {j: results[j].text for j in deps[i]})
+            progress_callback = None
+            if on_progress is not None:
+                async def progress_callback(progress, total, message):
+                    on_progress(res, progress, total, message)
+
+            async with semaphore:
+                res.started = time.perf_counter() - t0
+                try:
+                    call = session.call_tool(res.tool, res.arguments, progress_callback=progress_callback, meta=meta)
+                    result = await asyncio.wait_for(call, step_timeout)
+                    res.text = result_text(result)
+                    res.ok = not getattr(result, "isError", False)
+                except asyncio.TimeoutError:
+                    res.text = f"❌ Tool call timed out after {step_timeout:g}s"
+                except Exception as e:
+                    res.text = f"❌ Tool call failed: {e}"
+                res.elapsed = time.perf_counter() - t0 - res.started
+        finally:
+            done[i].set()
+            if on_step is not None:
+                on_step(res)
+
+    await asyncio.gather(*(run(i) for i in range(len(plan))))
+    return results
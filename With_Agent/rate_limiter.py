@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Quota-aware scheduling of outgoing upstream requests
+- One token bucket per upstream (requests/second plus burst)
+- Waiting requests are served by lane, FIFO within a lane: interactive tool
+  calls first, then the sub-requests of fan-out tools (get_weather_batch,
+  search_flights), then batch traffic. A caller picks its lane with the
+  "lane" key of the tools/call _meta (the batch client sends "batch")
+- A 429 pauses the whole upstream for its Retry-After instead of letting
+  every queued request hit the limit again
+- Requests whose expected queue wait exceeds their time budget fail fast
+- Buckets are per process: each of RATE_LIMIT_PROCESSES processes sharing the
+  API keys keeps 1/N of every limit (HTTP workers and the batch client's stdio
+  servers set it themselves)
+"""
+
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import os
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+from metrics import Histogram
+from resilience import UpstreamUnavailable
+
+LANES = ("interactive", "fanout", "batch")
+LANE_META_KEY = "lane"  # tools/call _meta field naming the caller's lane
+
+# Published free/test-tier limits; override with RATE_LIMIT_<NAME>_RPS / _BURST
+DEFAULT_LIMITS = {
+    "amadeus": (10.0, 1),       # test environment: 10 TPS, at most one request per 100 ms
+    "openweather": (1.0, 60),   # free plan: 60 calls per minute
+    "opentripmap": (10.0, 10),
+}
+
+current_lane = contextvars.ContextVar("current_lane", default="interactive")
+
+
+@contextmanager
+def lane(name: str):
+    """Run the enclosed code (and tasks it starts) in the given scheduling lane."""
+    if name not in LANES:
+        raise ValueError(f"Unknown lane: {name}")
+    token = current_lane.set(name)
+    try:
+        yield
+    finally:
+        current_lane.reset(token)
+
+
+def fanout_lane() -> str:
+    """Lane for the sub-requests of a fan-out call: below interactive, never above the caller's own lane."""
+    return max(current_lane.get(), "fanout", key=LANES.index)
+
+
+def in_lane(get_lane):
+    """Decorator: run the coroutine function in the lane `get_lane()` names (None or unknown: unchanged)."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            name = get_lane()
+            if name not in LANES:
+                return await fn(*args, **kwargs)
+            with lane(name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RateLimited(UpstreamUnavailable):
+    """Raised when a request cannot get a slot within its time budget."""
+
+
+def retry_after_seconds(value: str | None, default: float = 1.0) -> float:
+    """Parse a Retry-After header (delta seconds or HTTP date)."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def give_back(self):
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class UpstreamScheduler:
+    def __init__(self, name: str, rate: float, burst: float):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None  # rate 0: unlimited
+        self.paused_until = 0.0
+        self._waiters = []  # heap of (lane priority, sequence, future)
+        self._sequence = itertools.count()
+        self._pump_task = None
+        self.wait = {lane_name: Histogram() for lane_name in LANES}
+        self.throttled = 0
+        self.rejected = 0
+
+    def _delay(self, now: float) -> float:
+        delay = self.bucket.delay(now) if self.bucket else 0.0
+        return max(delay, self.paused_until - now)
+
+    def estimated_wait(self, priority: int) -> float:
+        now = time.monotonic()
+        ahead = sum(1 for p, _, f in self._waiters if p <= priority and not f.done())
+        queued = ahead / self.bucket.rate if self.bucket else 0.0
+        return self._delay(now) + queued
+
+    async def acquire(self, budget: float | None = None):
+        """Wait for a request slot in the current lane, or raise RateLimited."""
+        lane_name = current_lane.get()
+        priority = LANES.index(lane_name)
+        started = time.monotonic()
+        if not self._waiters and self._delay(started) <= 0:
+            if self.bucket:
+                self.bucket.take()
+            self.wait[lane_name].observe(0.0)
+            return
+
+        expected = self.estimated_wait(priority)
+        if budget is not None and expected > budget:
+            self.rejected += 1
+            raise RateLimited(f"{self.name} rate limit: expected queue wait {expected:.1f}s exceeds {budget:.1f}s")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._pump_task is None:
+            self._pump_task = asyncio.ensure_future(self._pump())
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and self.bucket:
+                self.bucket.give_back()  # granted just as the caller gave up
+            raise
+        self.wait[lane_name].observe(time.monotonic() - started)
+
+    async def _pump(self):
+        """Grant slots to queued requests, highest-priority lane first, as tokens allow."""
+        try:
+            while self._waiters:
+                delay = self._delay(time.monotonic())
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                _, _, future = heapq.heappop(self._waiters)
+                if future.done():
+                    continue  # waiter was cancelled
+                if self.bucket:
+                    self.bucket.take()
+                future.set_result(None)
+        finally:
+            self._pump_task = None
+
+    def throttle(self, retry_after: float):
+        """The upstream answered 429: hold every request until Retry-After has passed."""
+        self.throttled += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        if self.bucket:
+            self.bucket.tokens = min(self.bucket.tokens, 0.0)
+
+    def stats(self) -> dict:
+        stats = {
+            "queue_depth": sum(1 for _, _, f in self._waiters if not f.done()),
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+            "paused_s": round(max(0.0, self.paused_until - time.monotonic()), 1),
+        }
+        for name, hist in self.wait.items():
+            stats[f"{name}_wait_ms_p50"] = round(hist.quantile(0.50) * 1000, 1)
+            stats[f"{name}_wait_ms_p95"] = round(hist.quantile(0.95) * 1000, 1)
+        return stats
+
+
+class RateLimiter:
+    """Schedulers for every upstream, configured from RATE_LIMIT_* variables."""
+
+    def __init__(self, upstreams):
+        self.schedulers = {}
+        for name in upstreams:
+            rate, burst = DEFAULT_LIMITS.get(name, (0.0, 1))
+            rate = float(os.getenv(f"RATE_LIMIT_{name.upper()}_RPS") or os.getenv("RATE_LIMIT_RPS") or rate)
+            burst = float(os.getenv(f"RATE_LIMIT_{name.upper()}_BURST") or os.getenv("RATE_LIMIT_BURST") or burst)
+            self.schedulers[name] = UpstreamScheduler(name, rate, burst)
+        self.split(int(os.getenv("RATE_LIMIT_PROCESSES", "1")))
+
+    def split(self, parts: int):
+        """Keep 1/parts of every limit, for one of `parts` processes sharing the same API keys."""
+        if parts <= 1:
+            return
+        for scheduler in self.schedulers.values():
+            if scheduler.bucket:
+                scheduler.bucket.rate /= parts
+                scheduler.bucket.burst = max(1.0, scheduler.bucket.burst / parts)
+                scheduler.bucket.tokens = min(scheduler.bucket.tokens, scheduler.bucket.burst)
+
+    def __getitem__(self, upstream: str) -> UpstreamScheduler:
+        return self.schedulers[upstream]
+
+    def stats(self) -> dict:
+        return {f"{name}_{key}": value for name, scheduler in self.schedulers.items()
+                for key, value in scheduler.stats().items()}
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Per-upstream resilience for outgoing HTTP calls
+- Connect/read timeouts per attempt and an overall deadline per call; time
+  spent queueing for a rate-limit slot extends the deadline instead of eating it
+- Bounded retries with full-jitter exponential backoff (idempotent calls only)
+- Optional hedged requests: a second attempt once the first has run longer
+  than the operation's observed p95
+- Circuit breaker: after repeated failures calls fail fast until a probe succeeds
+- Settings per upstream from UPSTREAM_<NAME>_<SETTING>, falling back to UPSTREAM_<SETTING>
+"""
+
+import asyncio
+import dataclasses
+import os
+import random
+import time
+
+# Responses worth another attempt; anything else (incl. 4xx) is returned to the caller
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+
+class UpstreamUnavailable(Exception):
+    """Raised when an upstream's circuit is open or every attempt failed without a response."""
+
+
+@dataclasses.dataclass(slots=True)
+class Policy:
+    connect_timeout: float = 5.0
+    read_timeout: float = 10.0
+    deadline: float = 20.0
+    retries: int = 2
+    backoff_base: float = 0.2
+    backoff_cap: float = 2.0
+    hedge: bool = False
+    hedge_min_delay: float = 0.05
+    hedge_min_samples: int = 20
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls, upstream: str) -> "Policy":
+        values = {}
+        for field in dataclasses.fields(cls):
+            setting = field.name.upper()
+            raw = os.getenv(f"UPSTREAM_{upstream.upper()}_{setting}") or os.getenv(f"UPSTREAM_{setting}")
+            if not raw:
+                continue
+            if field.type in (bool, "bool"):
+                values[field.name] = raw.strip().lower() in ("1", "true", "yes", "on")
+            else:
+                values[field.name] = (int if field.type in (int, "int") else float)(raw)
+        return cls(**values)
+
+    def client_timeout(self, remaining: float):
+        import aiohttp  # deferred with the HTTP pool (see http_pool.py)
+
+        return aiohttp.ClientTimeout(total=remaining, sock_connect=self.connect_timeout,
+                                     sock_read=self.read_timeout)
+
+
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` consecutive failures; one probe after `reset_timeout`."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self.rejected = 0
+        self._probing = False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if self.retry_in() > 0:
+                self.rejected += 1
+                return False
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probing:
+                self.rejected += 1
+                return False
+            self._probing = True
+        return True
+
+    def success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opens += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """The call was cancelled: neither outcome, but let the next caller probe."""
+        self._probing = False
+
+
+class Resilience:
+    def __init__(self, upstreams, metrics=None):
+        self.policies = {name: Policy.from_env(name) for name in upstreams}
+        self.breakers = {name: CircuitBreaker(p.failure_threshold, p.reset_timeout)
+                         for name, p in self.policies.items()}
+        self.metrics = metrics  # source of observed latencies for hedge delays
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+        self.gave_up = 0
+
+    async def call(self, upstream: str, operation: str, attempt, idempotent: bool = True, admit=None):
+        """
+        Run `attempt(timeout) -> (status, data)` under the upstream's policy.
+        Returns the first non-retryable response (or the last 5xx one); raises
+        UpstreamUnavailable when the circuit is open or no attempt got a response.
+        `admit(budget)` is awaited before every attempt, outside its timeout, and
+        may raise UpstreamUnavailable (e.g. RateLimited), which is not a failure.
+        """
+        import aiohttp
+
+        policy, breaker = self.policies[upstream], self.breakers[upstream]
+        if not breaker.allow():
+            raise UpstreamUnavailable(f"{upstream} is unavailable (circuit open, retry in {breaker.retry_in():.0f}s)")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.deadline
+        tries = 1 + (policy.retries if idempotent else 0)
+        response, error = None, None
+        try:
+            for n in range(tries):
+                if admit is not None:
+                    queued_at = loop.time()
+                    await admit(max(0.0, deadline - queued_at))
+                    deadline += loop.time() - queued_at
+                remaining = deadline - loop.time()
+                send = lambda: attempt(policy.client_timeout(remaining))
+                try:
+                    if idempotent and policy.hedge:
+                        hedged = self._hedged(upstream, operation, policy, send, admit)
+                        response = await asyncio.wait_for(hedged, remaining)
+                    else:
+                        response = await asyncio.wait_for(send(), remaining)
+                    error = None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    response, error = None, e
+                    self.timeouts += isinstance(e, asyncio.TimeoutError)
+                if response is not None and response[0] not in RETRY_STATUSES:
+                    breaker.success()
+                    return response
+                if n + 1 == tries:
+                    break
+                delay = random.uniform(0, min(policy.backoff_cap, policy.backoff_base * 2 ** n))
+                if loop.time() + delay >= deadline:
+                    break
+                self.retries += 1
+                await asyncio.sleep(delay)
+        except BaseException:  # cancelled, or an error that says nothing about upstream health
+            breaker.release()
+            raise
+
+        breaker.failure()
+        self.gave_up += 1
+        if response is not None:
+            return response
+        raise UpstreamUnavailable(f"{upstream} {operation} failed: {str(error) or type(error).__name__}") from error
+
+    def hedge_delay(self, upstream: str, operation: str, policy: Policy) -> float | None:
+        if self.metrics is None:
+            return None
+        p95 = self.metrics.operation_quantile(upstream, operation, 0.95, min_count=policy.hedge_min_samples)
+        return None if p95 is None else max(policy.hedge_min_delay, p95)
+
+    async def _hedged(self, upstream: str, operation: str, policy: Policy, send, admit=None):
+        """First response of the original attempt and, if it is slow, one duplicate (when admitted at once)."""
+        delay = self.hedge_delay(upstream, operation, policy)
+        tasks = [asyncio.ensure_future(send())]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and await self._admitted_now(admit):
+                    self.hedges += 1
+                    tasks.append(asyncio.ensure_future(send()))
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.hedge_wins += task is not tasks[0]
+                        return task.result()
+                if not pending:
+                    raise tasks[-1].exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # mark the losing attempt's error as retrieved
+
+    @staticmethod
+    async def _admitted_now(admit) -> bool:
+        """A hedge is only worth sending if it does not have to queue."""
+        if admit is None:
+            return True
+        try:
+            await admit(0.0)
+        except UpstreamUnavailable:
+            return False
+        return True
+
+    def stats(self) -> dict:
+        stats = {
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "timeouts": self.timeouts,
+            "gave_up": self.gave_up,
+        }
+        for name, breaker in self.breakers.items():
+            stats[f"{name}_circuit_open"] = int(breaker.state != "closed")
+            stats[f"{name}_circuit_opens"] = breaker.opens
+            stats[f"{name}_rejected"] = breaker.rejected
+        return stats
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Concurrent start-up of the batch client's MCP sessions
+- Every session opens in its own background task as soon as the launcher is
+  entered, so batch mode's stdio servers start side by side instead of one
+  after another
+- Sessions live only as long as the launcher (one client run). Servers that
+  stay warm across runs come from the HTTP mode instead: start
+  `travel_server.py --http` once and pass --url to the client
+- Each session is closed by the task that opened it: stdio/HTTP transports
+  must be exited from the task that entered them
+"""
+
+import asyncio
+
+
+class SessionLauncher:
+    def __init__(self, open_session, count: int = 1):
+        """`open_session()` is an async context manager yielding one ready session."""
+        self.open_session = open_session
+        self.count = max(1, count)
+        self._ready: list[asyncio.Future] = []
+        self._tasks: list[asyncio.Task] = []
+        self._closing = asyncio.Event()
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        for _ in range(self.count):
+            ready = loop.create_future()
+            self._ready.append(ready)
+            self._tasks.append(asyncio.ensure_future(self._run(ready)))
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _run(self, ready: asyncio.Future):
+        try:
+            async with self.open_session() as session:
+                if not ready.done():  # not cancelled by close()
+                    ready.set_result(session)
+                await self._closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+
+    async def sessions(self) -> list:
+        """Every session once all have started; raises the first start-up failure."""
+        return list(await asyncio.gather(*self._ready))
+
+    async def close(self):
+        self._closing.set()
+        for ready in self._ready:
+            ready.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
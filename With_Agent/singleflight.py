@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Single-flight coalescing of identical in-flight tool calls
+- Calls are keyed by tool name plus canonicalized (JSON, sorted) arguments
+- Concurrent identical calls share one execution and its result or exception
+- A caller that is cancelled only stops waiting; the shared call is
+  cancelled once no caller is waiting on it any more
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+
+
+def call_key(name: str, arguments: dict) -> str:
+    return name + ":" + json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict[str, asyncio.Task] = {}
+        self._waiters: dict[str, int] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    async def do(self, key: str, fn):
+        """Await `fn()`, or the identical call already in flight under `key`."""
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.followers += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(key) == 1:
+                task.cancel()  # last waiter gone: nobody needs the result
+            raise
+        finally:
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved; waiters already received it
+
+    def coalesce(self, fn):
+        """Decorator for async tools: identical concurrent calls share one execution."""
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return await self.do(call_key(fn.__name__, bound.arguments), lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "followers": self.followers}
@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agent_memory import AgentMemory  # noqa: E402
+
+
+def test_zero_recent_size_keeps_the_latest_call():
+    memory = AgentMemory(recent_size=0)
+    memory.record("get_weather", {"city": "Paris"}, "Weather in Paris: 12°C")
+    memory.record("get_weather", {"city": "Rome"}, "Weather in Rome: 18°C")
+    text = memory.render()
+    assert "get_weather x1 (Paris)" in text
+    assert "Rome" in text
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from airport_index import AirportIndex  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def index():
+    return AirportIndex.load()
+
+
+@pytest.mark.parametrize("query, code", [
+    ("JFK", "JFK"),
+    ("new york", "NYC"),       # metro code and its airports count as one city
+    ("Bombay", "BOM"),
+    ("Heathrow", "LHR"),
+    ("Johannes", "JNB"),       # prefix of one city's names
+    ("XYZ", "XYZ"),            # unknown three letters pass through
+])
+def test_code_for_resolves_unambiguous_input(index, query, code):
+    assert index.code_for(query) == code
+
+
+@pytest.mark.parametrize("query", ["San Jose", "san josé", "York", "Atlantis", "Londn"])
+def test_code_for_refuses_ambiguous_or_unknown_input(index, query):
+    assert index.code_for(query) is None
+
+
+def test_shared_exact_name_is_offered_as_suggestions(index):
+    codes = {m["code"] for m in index.resolve("San Jose")}
+    assert {"SJC", "SJO"} <= codes
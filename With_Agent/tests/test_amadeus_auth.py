@@ -0,0 +1,32 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from amadeus_auth import AmadeusTokenManager  # noqa: E402
+
+
+def test_failed_background_refresh_backs_off():
+    posts = []
+
+    async def request(method, url, **kwargs):
+        posts.append(url)
+        return 500, {"error": "server_error"}
+
+    async def scenario():
+        auth = AmadeusTokenManager(request, "id", "secret", token_url="http://token")
+        # A valid token inside the refresh-ahead window
+        auth._token, auth._lifetime = "cached", 1799.0
+        auth._expires_at = time.monotonic() + 200
+        tokens = []
+        for _ in range(100):
+            tokens.append(await auth.get_token())
+            await asyncio.sleep(0)
+        return auth, tokens
+
+    auth, tokens = asyncio.run(scenario())
+    assert set(tokens) == {"cached"}
+    assert len(posts) == 1
+    assert auth.failures == 1
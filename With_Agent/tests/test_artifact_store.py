@@ -0,0 +1,89 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from artifact_store import ArtifactStore  # noqa: E402
+
+
+def slow_render(started: asyncio.Event, release: asyncio.Event, calls: list):
+    async def render(tmp_path):
+        calls.append(tmp_path)
+        started.set()
+        await release.wait()
+        Path(tmp_path).write_bytes(b"%PDF-1.4")
+    return render
+
+
+def test_cancelled_first_caller_does_not_fail_the_others(tmp_path):
+    async def scenario():
+        store = ArtifactStore(str(tmp_path))
+        started, release, calls = asyncio.Event(), asyncio.Event(), []
+        render = slow_render(started, release, calls)
+        first = asyncio.ensure_future(store.get_or_render("k", render))
+        await started.wait()
+        second = asyncio.ensure_future(store.get_or_render("k", render))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        path, cached = await second
+        assert first.cancelled()
+        return path, cached, calls
+
+    path, cached, calls = asyncio.run(scenario())
+    assert cached and len(calls) == 1
+    assert path.read_bytes() == b"%PDF-1.4"
+
+
+def test_render_is_cancelled_when_every_caller_leaves(tmp_path):
+    async def scenario():
+        store = ArtifactStore(str(tmp_path))
+        started, release, calls = asyncio.Event(), asyncio.Event(), []
+        render = slow_render(started, release, calls)
+        callers = [asyncio.ensure_future(store.get_or_render("k", render)) for _ in range(2)]
+        await started.wait()
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        return store
+
+    store = asyncio.run(scenario())
+    assert store.get("k") is None
+    assert not store._renders.in_flight("k")
+    assert list(tmp_path.iterdir()) == []  # the temp file was cleaned up
+
+
+def test_abandoned_pool_render_leaves_no_temp_file(tmp_path):
+    import threading
+
+    from pdf_worker import RenderPool
+
+    release = threading.Event()
+
+    def write_pdf(tmp):
+        release.wait(5)
+        Path(tmp).write_bytes(b"%PDF-1.4")
+
+    async def scenario():
+        store = ArtifactStore(str(tmp_path))
+        pool = RenderPool(kind="thread", workers=1, queue_size=2, queue_wait=0)
+
+        async def render(tmp):
+            await pool.submit(write_pdf, tmp)
+
+        caller = asyncio.ensure_future(store.get_or_render("k", render))
+        await asyncio.sleep(0.05)  # the job is running in the worker
+        caller.cancel()
+        await asyncio.sleep(0.05)
+        release.set()  # the worker writes the temp file only now
+        await asyncio.gather(caller, return_exceptions=True)
+        for _ in range(50):
+            if not store._renders.in_flight("k"):
+                break
+            await asyncio.sleep(0.01)
+        pool.shutdown()
+
+    asyncio.run(scenario())
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from flight_search import check_filters, date_window, window_days  # noqa: E402
+
+
+def test_window_days_counts_without_expanding():
+    assert window_days("2026-11-01") == 1
+    assert window_days("2026-11-01", "2026-11-03") == len(date_window("2026-11-01", "2026-11-03")) == 3
+    assert window_days("2026-11-01", "9999-12-31") > 2_900_000
+    with pytest.raises(ValueError):
+        window_days("2026-11-03", "2026-11-01")
+
+
+@pytest.mark.parametrize("sort_by, after, before", [
+    ("cheapest", None, None),
+    ("price", "7:30", None),
+    ("price", None, "24:00"),
+    ("price", "morning", None),
+])
+def test_check_filters_rejects_bad_arguments(sort_by, after, before):
+    with pytest.raises(ValueError):
+        check_filters(sort_by, after, before)
+
+
+def test_check_filters_accepts_valid_arguments():
+    check_filters("duration", "07:30", "23:59")
@@ -0,0 +1,29 @@
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from geocode_store import GeocodeStore  # noqa: E402
+
+PARIS = {"name": "Paris", "country": "FR", "lat": 48.85, "lon": 2.35}
+
+
+def test_write_back_is_skipped_while_another_process_writes(tmp_path):
+    path = str(tmp_path / "geo.sqlite3")
+    store = GeocodeStore(path, busy_timeout=0.05)
+    store.get("warm up")  # creates the schema
+    other = sqlite3.connect(path)
+    other.execute("BEGIN IMMEDIATE")  # hold the write lock, like the prewarm CLI mid-transaction
+    try:
+        t0 = time.perf_counter()
+        assert store.put("Paris", PARIS) is False
+        assert time.perf_counter() - t0 < 1.0
+    finally:
+        other.rollback()
+        other.close()
+    assert store.get("Paris") == PARIS  # still served from memory
+    assert store.stats()["skipped_writes"] == 1
+    assert store.put("Paris", PARIS) is True
+    store.close()
@@ -0,0 +1,35 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdf_worker import RenderPool  # noqa: E402
+
+
+def test_cancelled_caller_keeps_the_slot_until_the_job_ends():
+    release = threading.Event()
+
+    async def scenario():
+        pool = RenderPool(kind="thread", workers=1, queue_size=1, queue_wait=0)
+        caller = asyncio.ensure_future(pool.submit(release.wait, 5))
+        await asyncio.sleep(0.05)  # the job is running in the worker
+        caller.cancel()
+        await asyncio.sleep(0.05)
+        waiting = not caller.done()  # the cancelled caller waits for its running job
+        during = pool.stats()["in_flight"]
+        try:
+            await pool.submit(lambda: None)
+            busy = False
+        except Exception as e:
+            busy = type(e).__name__ == "RenderPoolBusy"
+        release.set()
+        await asyncio.gather(caller, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        cancelled, after = caller.cancelled(), pool.stats()["in_flight"]
+        await pool.submit(lambda: None)  # the slot is free again
+        pool.shutdown()
+        return waiting, during, busy, cancelled, after
+
+    assert asyncio.run(scenario()) == (True, 1, True, True, 0)
@@ -0,0 +1,84 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from plan_executor import dependencies, execute_plan, invalid_references  # noqa: E402
+
+
+class FakeSession:
+    """Echoes each call as "<tool>(<arguments>)"."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def call_tool(self, tool, arguments, progress_callback=None, meta=None):
+        self.calls.append((tool, arguments))
+        self.meta = meta
+        text = f"{tool}({arguments})"
+        return SimpleNamespace(content=[SimpleNamespace(text=text)], isError=False)
+
+
+def run(plan):
+    session = FakeSession()
+    return asyncio.run(execute_plan(session, plan)), session
+
+
+def test_placeholder_substitutes_earlier_output():
+    results, _ = run([
+        {"tool": "a", "arguments": {}},
+        {"tool": "b", "arguments": {"x": "{{step1}}"}},
+    ])
+    assert [r.ok for r in results] == [True, True]
+    assert results[1].arguments == {"x": "a({})"}
+
+
+def test_reference_to_later_step_fails_the_step():
+    results, session = run([
+        {"tool": "a", "arguments": {"x": "{{step2}}"}},
+        {"tool": "b", "arguments": {}},
+    ])
+    assert not results[0].ok
+    assert "Invalid step reference" in results[0].text
+    assert results[1].ok
+    assert [tool for tool, _ in session.calls] == ["b"]
+
+
+def test_self_reference_fails_the_step():
+    results, session = run([{"tool": "a", "arguments": {"x": "{{step1}}"}}])
+    assert not results[0].ok
+    assert "Invalid step reference(s) [1]" in results[0].text
+    assert session.calls == []
+
+
+def test_unknown_step_fails_and_skips_dependents():
+    results, _ = run([
+        {"tool": "a", "arguments": {"x": "{{step9}}"}},
+        {"tool": "b", "arguments": {}, "depends_on": [1]},
+    ])
+    assert not results[0].ok
+    assert results[1].text.startswith("❌ Skipped")
+
+
+def test_depends_on_accepts_a_bare_int():
+    plan = [{"tool": "a", "arguments": {}}, {"tool": "b", "arguments": {}, "depends_on": 1}]
+    assert dependencies(plan) == [set(), {0}]
+    assert invalid_references(plan) == [[], []]
+    results, _ = run(plan)
+    assert [r.ok for r in results] == [True, True]
+    assert results[1].started >= results[0].started + results[0].elapsed
+
+
+def test_malformed_depends_on_is_invalid():
+    plan = [{"tool": "a", "arguments": {}}, {"tool": "b", "arguments": {}, "depends_on": ["first"]}]
+    assert invalid_references(plan) == [[], ["first"]]
+    results, _ = run(plan)
+    assert results[0].ok and not results[1].ok
+
+
+def test_meta_is_sent_with_every_call():
+    session = FakeSession()
+    asyncio.run(execute_plan(session, [{"tool": "a", "arguments": {}}], meta={"lane": "batch"}))
+    assert session.meta == {"lane": "batch"}
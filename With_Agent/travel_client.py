@@ -185,60 +185,136 @@ Travel Agent using MCP + Gemini (Autonomous)
 import asyncio
 import os
 import json
+import time
+import argparse
+import threading
+from contextlib import asynccontextmanager, nullcontext
 from dotenv import load_dotenv
 from mcp.client.stdio import stdio_client, StdioServerParameters
+from mcp.client.streamable_http import streamablehttp_client
 from mcp.client.session import ClientSession
-from semantic_kernel import Kernel
-from semantic_kernel.connectors.ai.google.google_ai.services.google_ai_chat_completion import GoogleAIChatCompletion, ChatHistory
-from semantic_kernel.connectors.ai.google.google_ai.google_ai_prompt_execution_settings import GoogleAIChatPromptExecutionSettings
+from mcp import types
+
+from plan_executor import execute_plan
+from agent_memory import AgentMemory
+from intent_parser import parse_intent, PlanCache
+from batch_io import read_queries, Checkpoint, OrderedWriter, latency_summary
+from session_launcher import SessionLauncher
 
 # ---------- Load Env ----------
 load_dotenv()
 GEMINI_KEY = os.getenv("GEMINI_API_KEY", "")
+PLAN_CONCURRENCY = int(os.getenv("PLAN_CONCURRENCY", "4"))
+PLAN_STEP_TIMEOUT = float(os.getenv("PLAN_STEP_TIMEOUT", "60"))
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "600"))
+MEMORY_RECENT_SIZE = int(os.getenv("MEMORY_RECENT_SIZE", "6"))
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "256"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "16"))
+BATCH_SESSIONS = int(os.getenv("BATCH_SESSIONS", "4"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+BATCH_QUERY_TIMEOUT = float(os.getenv("BATCH_QUERY_TIMEOUT", "180"))
+# Tool-call _meta of batch queries: the server queues their upstream requests behind interactive ones
+BATCH_META = {"lane": "batch"}
 
 # ---------- Setup Semantic Kernel + Gemini ----------
-kernel = Kernel()
-kernel.add_service(
-    GoogleAIChatCompletion(
-        service_id="gemini",
-        api_key=GEMINI_KEY or None,
-        gemini_model_id="gemini-1.5-flash",
-    )
-)
+# Semantic Kernel takes seconds to import, so it is built on the first Gemini plan
+# (or warmed in the background by main()); fast-path queries never wait for it.
+_kernel = None
+_kernel_lock = threading.Lock()
+
+
+def get_kernel():
+    global _kernel
+    with _kernel_lock:
+        if _kernel is None:
+            from semantic_kernel import Kernel
+            from semantic_kernel.connectors.ai.google.google_ai.services.google_ai_chat_completion import GoogleAIChatCompletion
+
+            kernel = Kernel()
+            kernel.add_service(
+                GoogleAIChatCompletion(
+                    service_id="gemini",
+                    api_key=GEMINI_KEY or None,
+                    gemini_model_id="gemini-1.5-flash",
+                )
+            )
+            _kernel = kernel
+    return _kernel
+
+
+def warm_kernel():
+    """Build the kernel in a daemon thread; a failure here resurfaces on the first Gemini plan."""
+    def build():
+        try:
+            get_kernel()
+        except Exception:
+            pass
 
-# ---------- Autonomous Agent Logic ----------
-async def agent(query: str, session: ClientSession, memory: dict):
+    threading.Thread(target=build, name="kernel-warmup", daemon=True).start()
+
+# ---------- Tool Catalog (cached per session) ----------
+class ToolCatalog:
     """
-    The agent:
-    - Keeps memory of past actions
-    - Decides which MCP tool(s) to call
-    - Executes tools and updates memory
+    Caches the server's tool list and the prompt block rendered from it.
+    Invalidated only when the server sends notifications/tools/list_changed.
     """
-    if not GEMINI_KEY:
-        return "❌ GEMINI_API_KEY is not set."
 
-    llm = kernel.get_service("gemini")
+    def __init__(self):
+        self.version = 0
+        self._tools = None
+        self._prompt_block = None
+
+    async def message_handler(self, message):
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ToolListChangedNotification
+        ):
+            self.invalidate()
+
+    def invalidate(self):
+        self._tools = None
+        self._prompt_block = None
+        self.version += 1
+
+    async def tools(self, session: ClientSession):
+        if self._tools is None:
+            self._tools = (await session.list_tools()).tools
+        return self._tools
+
+    async def prompt_block(self, session: ClientSession) -> str:
+        if self._prompt_block is None:
+            tools = await self.tools(session)
+            self._prompt_block = "\n".join(
+                f"- {t.name}({t.inputSchema}) → {t.description}" for t in tools
+            )
+        return self._prompt_block
+
+
+# ---------- Gemini Planner ----------
+async def gemini_plan(query: str, memory: AgentMemory, tool_block: str) -> list:
+    """Ask Gemini for a JSON plan; raises ValueError if the reply cannot be parsed."""
+    kernel = await asyncio.to_thread(get_kernel)  # imports off the event loop on first use
+    from semantic_kernel.contents import ChatHistory
+    from semantic_kernel.connectors.ai.google.google_ai.google_ai_prompt_execution_settings import GoogleAIChatPromptExecutionSettings
 
-    # Step 1: List available tools once
-    tools_list = await session.list_tools()
-    tool_descriptions = [
-        f"- {t.name}({t.inputSchema}) → {t.description}" for t in tools_list.tools
-    ]
+    llm = kernel.get_service("gemini")
 
-    # Step 2: Build system prompt with memory
-    memory_text = json.dumps(memory) if memory else "No past memory."
+    # Build system prompt with memory
+    memory_text = memory.render() if memory else "No past memory."
     system_prompt = (
         "You are an autonomous travel assistant. The user will ask questions.\n"
         "Here is your memory of past actions:\n"
         f"{memory_text}\n\n"
         "You have the following tools available:\n"
-        f"{chr(10).join(tool_descriptions)}\n\n"
+        f"{tool_block}\n\n"
         "Decide which tool(s) to call and in what order. "
+        "Prefer one composite tool (such as plan_trip) over several calls it already covers. "
+        "Independent steps run in parallel; if a step needs the output of an earlier step, "
+        "use \"{{stepN}}\" (N counts from 1) in its arguments or add \"depends_on\": [N]. "
         "Provide tool name(s) and arguments. Respond ONLY in JSON:"
         "{ 'plan': [ {'tool': '<tool_name>', 'arguments': {...}} ] }"
     )
 
-    # Step 3: Prepare chat
+    # Prepare chat
     chat = ChatHistory()
     chat.add_system_message(system_prompt)
     chat.add_user_message(f"User query: {query}")
@@ -246,67 +322,213 @@ async def agent(query: str, session: ClientSession, memory: dict):
     settings = GoogleAIChatPromptExecutionSettings(max_output_tokens=500)
     response = await llm.get_chat_message_content(chat, settings)
 
-    # Step 4: Extract JSON plan
+    # Extract JSON plan
     raw = getattr(response, "text", str(response))
     try:
         # Clean and parse
         s = raw.strip()
         if s.startswith("```"):
             s = s.split("\n", 1)[1].rsplit("```", 1)[0]
-        plan = json.loads(s).get("plan", [])
+        return json.loads(s).get("plan", [])
     except Exception as e:
-        return f"❌ Failed to parse plan: {e}\nRaw: {raw}"
+        raise ValueError(f"{e}\nRaw: {raw}") from e
+
 
-    results = []
-    # Step 5: Execute each tool in plan
-    for step in plan:
-        tool_name = step.get("tool")
-        args = step.get("arguments", {})
+# ---------- Autonomous Agent Logic ----------
+async def agent(query: str, session: ClientSession, memory: AgentMemory, catalog: ToolCatalog,
+                planner: PlanCache, stream=None, llm_slots: asyncio.Semaphore | None = None,
+                meta: dict | None = None) -> tuple[str, bool]:
+    """
+    The agent:
+    - Keeps memory of past actions
+    - Decides which MCP tool(s) to call (rule-based fast path, plan cache, then Gemini)
+    - Executes tools and updates memory
+    With `stream` (e.g. print), progress and each step's result are passed to it
+    as they happen and only the timing summary is returned. `llm_slots` caps
+    concurrent Gemini calls when many agents share the process (batch mode);
+    `meta` is sent with every tool call.
+    Returns (text, ok): ok is False when no plan was made or any step failed.
+    """
+    # Step 1: Tool list and descriptions (cached for the life of the session)
+    tools = await catalog.tools(session)
+
+    # Step 2: Plan without the LLM when the query shape is known or already planned
+    plan = parse_intent(query, {t.name for t in tools})
+    if plan is not None:
+        planner.fast_path += 1
+    else:
+        plan = planner.get(catalog.version, query)
+
+    # Step 3: Otherwise ask Gemini
+    if plan is None:
+        if not GEMINI_KEY:
+            return "❌ GEMINI_API_KEY is not set.", False
         try:
-            result = await session.call_tool(tool_name, args)
-            # Extract clean text
-            if hasattr(result, "content"):
-                texts = [c.text for c in result.content if hasattr(c, "text")]
-                results.append("\n".join(texts) if texts else str(result))
-            else:
-                results.append(str(result))
-            # Update memory
-            memory[tool_name] = args
-        except Exception as e:
-            results.append(f"❌ Tool call failed: {e}")
+            async with llm_slots or nullcontext():
+                plan = await gemini_plan(query, memory, await catalog.prompt_block(session))
+        except ValueError as e:
+            return f"❌ Failed to parse plan: {e}", False
+        planner.put(catalog.version, query, plan)
+
+    # Step 4: Execute the plan (independent steps concurrently, results in plan order)
+    on_step = on_progress = None
+    if stream is not None:
+        def on_step(step):
+            stream(f"{'✅' if step.ok else '⚠️'} {step.index + 1}. {step.tool} ({step.elapsed:.2f}s)\n{step.text}")
+
+        def on_progress(step, progress, total, message):
+            done = f"{progress:g}/{total:g}" if total else f"{progress:g}"
+            stream(f"⏳ {step.index + 1}. {step.tool}: {message or 'working'} ({done})")
+
+    steps = await execute_plan(session, plan, PLAN_CONCURRENCY, PLAN_STEP_TIMEOUT, on_step, on_progress, meta)
+    for step in steps:
+        memory.record(step.tool, step.arguments, step.text, step.ok)  # Update memory
+
+    results = [] if stream is not None else [step.text for step in steps]
+    if steps:
+        timings = ", ".join(f"{st.index + 1}. {st.tool} {st.elapsed:.2f}s" for st in steps)
+        results.append(f"⏱️ Step timings: {timings}")
+    return "\n".join(results), all(step.ok for step in steps)
+
+
+# ---------- Connection ----------
+@asynccontextmanager
+async def connect(server_url: str | None = None, env: dict | None = None):
+    """(read, write) streams to the Travel MCP Server: a URL if given, else a stdio subprocess (with `env`)."""
+    if server_url:
+        async with streamablehttp_client(server_url) as (read, write, _get_session_id):
+            yield read, write
+    else:
+        params = StdioServerParameters(
+            command="python",
+            args=["travel_server.py"],  # path to your MCP server
+            env=env,
+        )
+        async with stdio_client(params) as streams:
+            yield streams[0], streams[1]
+
+
+@asynccontextmanager
+async def open_session(server_url: str | None = None, env: dict | None = None):
+    """Initialized session plus its tool catalog (tool list already fetched)."""
+    catalog = ToolCatalog()
+    async with connect(server_url, env) as (read, write):
+        async with ClientSession(read, write, message_handler=catalog.message_handler) as session:
+            await session.initialize()
+            await catalog.tools(session)
+            yield session, catalog
 
-    return "\n".join(results)
+
+# ---------- Batch Mode ----------
+async def run_batch(in_path: str, out_path: str, server_url: str | None = None,
+                    concurrency: int = BATCH_CONCURRENCY, sessions: int = BATCH_SESSIONS,
+                    llm_concurrency: int = BATCH_LLM_CONCURRENCY, resume: bool = True):
+    """
+    Answer every query in a JSONL file: `concurrency` agents share `sessions`
+    MCP sessions, one plan cache and `llm_concurrency` Gemini slots. Results go
+    to `out_path` in input order; an interrupted run resumes from its checkpoint.
+    """
+    queries, fingerprint = read_queries(in_path)
+    checkpoint = Checkpoint(out_path, fingerprint)
+    start, offset = checkpoint.load() if resume else (0, 0)
+    if start:
+        print(f"↩️ Resuming after {start}/{len(queries)} completed queries")
+    writer = OrderedWriter(out_path, checkpoint, start, offset)
+    start = writer.next
+    planner = PlanCache(PLAN_CACHE_SIZE)
+    llm_slots = asyncio.Semaphore(llm_concurrency)
+    pending = iter(range(start, len(queries)))
+    latencies, failed = [], 0
+
+    async def worker(session, catalog):
+        nonlocal failed
+        for i in pending:
+            item = queries[i]
+            t0 = time.perf_counter()
+            try:
+                # Saved queries are independent, so each gets a fresh memory
+                memory = AgentMemory(MEMORY_TOKEN_BUDGET, MEMORY_RECENT_SIZE)
+                result, ok = await asyncio.wait_for(
+                    agent(item["query"], session, memory, catalog, planner, llm_slots=llm_slots, meta=BATCH_META),
+                    BATCH_QUERY_TIMEOUT,
+                )
+                error = None
+            except asyncio.TimeoutError:
+                result, ok, error = "", False, f"Timed out after {BATCH_QUERY_TIMEOUT:g}s"
+            except Exception as e:
+                result, ok, error = "", False, f"{type(e).__name__}: {e}"
+            elapsed = time.perf_counter() - t0
+            latencies.append(elapsed)
+            failed += not ok
+            writer.add(i, {"index": i, "id": item["id"], "query": item["query"], "ok": ok,
+                           "result": result, "error": error, "elapsed_s": round(elapsed, 3)})
+
+    started = time.perf_counter()
+    try:
+        # Server processes start concurrently rather than one after another
+        size = max(1, min(sessions, concurrency))
+        # Each stdio server process gets its share of the upstream rate limits
+        env = {"RATE_LIMIT_PROCESSES": str(size)}
+        async with SessionLauncher(lambda: open_session(server_url, env), size) as launcher:
+            members = await launcher.sessions()
+            # Workers are spread round-robin; each session multiplexes its share of the calls
+            await asyncio.gather(*(worker(*members[w % size]) for w in range(concurrency)))
+    finally:
+        writer.close(done=writer.next == len(queries))
+
+    wall = time.perf_counter() - started
+    done = len(latencies)
+    lat = latency_summary(latencies)
+    print(f"📦 Batch: {done} queries in {wall:.1f}s ({done / wall if wall else 0:.2f} q/s), {failed} failed")
+    print(f"⏱️ Latency p50 {lat['p50_s']}s, p95 {lat['p95_s']}s, p99 {lat['p99_s']}s, max {lat['max_s']}s")
+    print(f"📊 {planner.report()}")
+    print(f"📄 Results in {out_path}")
 
 
 # ---------- Main ----------
-async def main():
-    params = StdioServerParameters(
-        command="python",
-        args=["travel_server.py"],  # path to your MCP server
-    )
+async def main(server_url: str | None = None):
+    memory = AgentMemory(MEMORY_TOKEN_BUDGET, MEMORY_RECENT_SIZE)  # Agent memory (token-bounded)
+    planner = PlanCache(PLAN_CACHE_SIZE)
 
-    memory = {}  # Agent memory
+    if GEMINI_KEY:
+        warm_kernel()  # Semantic Kernel loads while the server starts and the user types
 
-    async with stdio_client(params) as streams:
-        async with ClientSession(streams[0], streams[1]) as session:
-            await session.initialize()
-            print("✅ Connected to Travel MCP Server")
+    async with open_session(server_url) as (session, catalog):
+        print("✅ Connected to Travel MCP Server")
 
-            tools = await session.list_tools()
-            print("\n🔧 Available tools:")
-            for t in tools.tools:
-                print(f"- {t.name} → {t.description}")
+        tools = await catalog.tools(session)
+        print("\n🔧 Available tools:")
+        for t in tools:
+            print(f"- {t.name} → {t.description}")
 
-            print("\n💬 Type your query (or 'exit' to quit):")
-            while True:
-                user_query = input("\nUser: ")
-                if user_query.lower() in ["exit", "quit"]:
-                    print("👋 Exiting agent.")
-                    break
+        print("\n💬 Type your query (or 'exit' to quit):")
+        while True:
+            user_query = input("\nUser: ")
+            if user_query.lower() in ["exit", "quit"]:
+                print(f"📊 {planner.report()}")
+                print("👋 Exiting agent.")
+                break
 
-                result = await agent(user_query, session, memory)
-                print("\n📌 Agent Result:\n", result)
+            # Step results are printed as they complete; the summary follows
+            print("\n📌 Agent Result:")
+            result, _ = await agent(user_query, session, memory, catalog, planner, stream=print)
+            print(result)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Travel Agent (MCP + Gemini)")
+    parser.add_argument("--url", default=os.getenv("TRAVEL_SERVER_URL") or None,
+                        help="streamable-HTTP server URL, e.g. http://127.0.0.1:8000/mcp (default: spawn stdio server). "
+                             "A server started once with `travel_server.py --http` stays warm across client runs")
+    parser.add_argument("--batch", metavar="QUERIES.jsonl", help="answer every query in a JSONL file, then exit")
+    parser.add_argument("--out", default="batch_results.jsonl", help="batch output JSONL (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="queries in flight")
+    parser.add_argument("--sessions", type=int, default=BATCH_SESSIONS, help="MCP sessions (server processes over stdio)")
+    parser.add_argument("--llm-concurrency", type=int, default=BATCH_LLM_CONCURRENCY, help="concurrent Gemini calls")
+    parser.add_argument("--no-resume", action="store_true", help="ignore an existing checkpoint and start over")
+    args = parser.parse_args()
+    if args.batch:
+        asyncio.run(run_batch(args.batch, args.out, args.url, args.concurrency, args.sessions,
+                              args.llm_concurrency, resume=not args.no_resume))
+    else:
+        asyncio.run(main(args.url))
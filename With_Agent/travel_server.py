@@ -6,120 +6,688 @@ Travel MCP Server (Standard MCP)
 - Generate itinerary (OpenTripMap → PDF)
 """
 
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 import os
+import sys
 import asyncio
-import aiohttp
+import argparse
+import base64
+import functools
+import json
+from contextlib import asynccontextmanager
 from pathlib import Path
 from dotenv import load_dotenv
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.pagesizes import A4
 
+from starlette.responses import JSONResponse, PlainTextResponse
 from mcp.server import FastMCP as Server
-from mcp.types import Tool
+from mcp.types import Tool, TextContent, EmbeddedResource, BlobResourceContents
+
+from http_pool import UpstreamPool
+from amadeus_auth import AmadeusTokenManager, AmadeusAuthError
+from ttl_cache import TTLCache, normalize_city
+from geocode_store import GeocodeStore
+from flight_search import check_filters, date_window, parse_offers, rank_offers, window_days
+from pdf_worker import RenderPool, RenderPoolBusy, render_itinerary_pdf, ITINERARY_TEMPLATE_VERSION
+from artifact_store import ArtifactStore
+from singleflight import SingleFlight
+from metrics import Metrics
+from resilience import Resilience, UpstreamUnavailable
+from rate_limiter import RateLimiter, LANE_META_KEY, fanout_lane, in_lane, lane, retry_after_seconds
+from airport_index import AirportIndex
 
 load_dotenv()
+IMPORT_MS = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
 
 AMADEUS_KEY = os.getenv("AMADEUS_API_KEY", "")
 AMADEUS_SECRET = os.getenv("AMADEUS_API_SECRET", "")
 OPENWEATHER_KEY = os.getenv("WEATHER_API_KEY", "")
 OPENTRIPMAP_KEY = os.getenv("OPENTRIPMAP_API_KEY", "")
 
-mcp = Server("TravelServer")
+# Upstream base URLs (point these at bench/stub_upstreams.py for offline load tests)
+AMADEUS_URL = os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com").rstrip("/")
+OPENWEATHER_URL = os.getenv("OPENWEATHER_BASE_URL", "http://api.openweathermap.org").rstrip("/")
+OPENTRIPMAP_URL = os.getenv("OPENTRIPMAP_BASE_URL", "https://api.opentripmap.com/0.1/en").rstrip("/")
 
-@mcp.tool(name="get_flight_details", description="Fetch live flight details from Amadeus API")
-async def get_flight_details(origin: str, destination: str, date: str) -> str:
-    async with aiohttp.ClientSession() as session:
-        # Step 1: Get Access Token
-        token_url = "https://test.api.amadeus.com/v1/security/oauth2/token"
-        async with session.post(token_url, data={
-            "grant_type": "client_credentials",
-            "client_id": AMADEUS_KEY,
-            "client_secret": AMADEUS_SECRET
-        }) as resp:
-            token_data = await resp.json()
-            if "access_token" not in token_data:
-                return f"Amadeus Auth Error: {token_data}"
-            token = token_data["access_token"]
-
-        # Step 2: Fetch Flights
-        url = "https://test.api.amadeus.com/v2/shopping/flight-offers"
+http_pool = UpstreamPool()
+metrics = Metrics()
+resilience = Resilience(http_pool.upstreams, metrics)
+rate_limiter = RateLimiter(http_pool.upstreams)
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", "3"))
+
+
+async def upstream_request(upstream: str, operation: str, method: str, url: str,
+                           idempotent: bool | None = None, **kwargs) -> tuple[int, object]:
+    """
+    One HTTP call through the shared pool under the upstream's rate limit and its
+    timeout, retry, hedging and circuit-breaker policy; each attempt is timed and
+    sized as metrics operation upstream.operation.
+    """
+    session = http_pool.session(upstream)
+    scheduler = rate_limiter[upstream]
+
+    async def attempt(timeout):
+        with metrics.span(upstream, operation) as span:
+            async with session.request(method, url, timeout=timeout, **kwargs) as resp:
+                body = await resp.read()
+            span.size = len(body)
+            span.error = resp.status >= 400
+        if resp.status == 429:
+            # Over quota: pause the upstream for Retry-After; queued requests wait it out
+            scheduler.throttle(retry_after_seconds(resp.headers.get("Retry-After")))
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:  # e.g. an HTML error page from a proxy
+            data = {"status": resp.status, "message": body[:200].decode("utf-8", "replace")}
+        return resp.status, data
+
+    if idempotent is None:
+        idempotent = method == "GET"
+    # Each attempt first queues for a slot, outside its timeout; a 429 re-queues the whole call
+    for _ in range(RATE_LIMIT_RETRIES + 1):
+        status, data = await resilience.call(upstream, operation, attempt, idempotent, admit=scheduler.acquire)
+        if status != 429:
+            break
+    return status, data
+
+
+# Client-credentials token requests are safe to repeat
+amadeus_auth = AmadeusTokenManager(functools.partial(upstream_request, "amadeus", "token", idempotent=True),
+                                   AMADEUS_KEY, AMADEUS_SECRET,
+                                   token_url=f"{AMADEUS_URL}/v1/security/oauth2/token")
+weather_cache = TTLCache(
+    maxsize=int(os.getenv("WEATHER_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("WEATHER_CACHE_TTL", "600")),
+    stale_ttl=float(os.getenv("WEATHER_CACHE_STALE", "1800")),
+    persist_path=os.getenv("WEATHER_CACHE_FILE") or None,
+)
+geocode_store = GeocodeStore(
+    path=os.getenv("GEOCODE_DB", "geocode.sqlite3"),
+    lru_size=int(os.getenv("GEOCODE_LRU_SIZE", "4096")),
+    busy_timeout=float(os.getenv("GEOCODE_BUSY_TIMEOUT", "0.05")),
+)
+pdf_pool = RenderPool()
+single_flight = SingleFlight()  # identical concurrent tool calls share one upstream request
+artifacts = ArtifactStore(
+    root=os.getenv("ITINERARY_DIR", "itineraries"),
+    quota_bytes=int(float(os.getenv("ITINERARY_QUOTA_MB", "200")) * 1024 * 1024),
+)
+airports = AirportIndex.load()  # bundled data/airports.tsv, resolves city names to IATA codes
+# Itinerary candidates: OpenTripMap places within the radius, in one request. /places/radius has
+# no offset to page with, and 500 is the largest `limit` it accepts
+ITINERARY_RADIUS_M = int(os.getenv("ITINERARY_RADIUS_M", "5000"))
+ITINERARY_MAX_PLACES = max(1, min(500, int(os.getenv("ITINERARY_MAX_PLACES", "500"))))
+ITINERARY_PLACES_PER_DAY = int(os.getenv("ITINERARY_PLACES_PER_DAY", "6"))
+
+# Cache and pool counters are read on demand by get_server_stats and /metrics
+metrics.register("weather_cache", weather_cache.stats)
+metrics.register("geocode", geocode_store.stats)
+metrics.register("amadeus_token", amadeus_auth.stats)
+metrics.register("single_flight", single_flight.stats)
+metrics.register("pdf_pool", pdf_pool.stats)
+metrics.register("artifacts", artifacts.stats)
+metrics.register("airports", airports.stats)
+metrics.register("resilience", resilience.stats)
+metrics.register("rate_limit", rate_limiter.stats)
+metrics.register("startup", lambda: startup)
+
+# Tool replies that report a failure as text instead of raising
+ERROR_PREFIXES = ("Weather Error", "No flights found", "Amadeus Auth Error", "City lookup failed",
+                  "Itinerary renderer busy", "Upstream unavailable", "Unknown airport")
+
+
+def is_error_reply(result) -> bool:
+    return isinstance(result, str) and result.startswith(ERROR_PREFIXES)
+
+
+# Shared resources are opened by the first user and closed by the last one. Over
+# streamable HTTP every MCP session enters the lifespan, while the HTTP app holds
+# it for the whole process so pools and caches are shared between clients.
+_lifespan_users = 0
+ready = False
+startup = {"import_ms": IMPORT_MS, "ready_ms": 0.0}
+
+
+@asynccontextmanager
+async def lifespan(server):
+    global _lifespan_users, ready
+    _lifespan_users += 1
+    if _lifespan_users == 1:
+        await http_pool.start()
+        weather_cache.load()
+        ready = True
+        startup["ready_ms"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+    try:
+        yield
+    finally:
+        _lifespan_users -= 1
+        if _lifespan_users == 0:
+            ready = False
+            weather_cache.save()
+            geocode_store.close()
+            pdf_pool.shutdown()
+            await http_pool.close()
+
+
+mcp = Server("TravelServer", lifespan=lifespan)
+
+
+class Progress:
+    """
+    Numbered MCP progress notifications for one tool call. Sent only when the
+    caller passed a progressToken; a no-op outside an MCP request.
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+
+    async def step(self, message: str):
+        self.done += 1
+        try:
+            await mcp.get_context().report_progress(self.done, self.total, message)
+        except ValueError:
+            pass  # called outside a request (in-process benchmark, CLI)
+
+
+def request_lane() -> str | None:
+    """Scheduling lane the caller named in the tools/call _meta (e.g. the batch client's "batch")."""
+    try:
+        meta = mcp.get_context().request_context.meta
+    except ValueError:
+        return None  # called outside a request
+    return getattr(meta, LANE_META_KEY, None) if meta is not None else None
+
+
+async def amadeus_get(url: str, params: dict, operation: str = "offers") -> dict:
+    """GET an Amadeus endpoint with the cached token, retrying once if it was rejected."""
+    for attempt in range(2):
+        token = await amadeus_auth.get_token()
         headers = {"Authorization": f"Bearer {token}"}
+        status, data = await upstream_request("amadeus", operation, "GET", url, headers=headers, params=params)
+        if status == 401 and attempt == 0:
+            amadeus_auth.invalidate()
+            continue
+        return data
+
+async def first_offer(origin: str, destination: str, date: str) -> dict:
+    """First Amadeus offer for a route and day, or {"ok": False, "error": <tool error reply>}."""
+    # Fetch Flights (the access token is cached by amadeus_auth)
+    url = f"{AMADEUS_URL}/v2/shopping/flight-offers"
+    params = {
+        "originLocationCode": origin,
+        "destinationLocationCode": destination,
+        "departureDate": date,
+        "adults": 1,
+        "currencyCode": "INR"
+    }
+    try:
+        data = await amadeus_get(url, params)
+    except AmadeusAuthError as e:
+        return {"ok": False, "error": f"Amadeus Auth Error: {e}"}
+    except UpstreamUnavailable as e:
+        return {"ok": False, "error": f"Upstream unavailable: {e}"}
+    if "data" not in data or not data["data"]:
+        return {"ok": False, "error": f"No flights found: {data}"}
+
+    offer = data["data"][0]
+    return {
+        "ok": True,
+        "origin": origin,
+        "destination": destination,
+        "date": date,
+        "carrier": offer["validatingAirlineCodes"][0],
+        "price": offer["price"]["total"],
+        "currency": "INR",
+        "departure": offer["itineraries"][0]["segments"][0]["departure"]["at"],
+        "arrival": offer["itineraries"][0]["segments"][0]["arrival"]["at"],
+    }
+
+
+def airport_code(value: str) -> str:
+    """IATA code for a code, city, airport name or alias; ambiguous input raises with suggestions."""
+    code = airports.code_for(value)
+    if code is None:
+        suggestions = ", ".join(f"{m['code']} ({m['city']}, {m['country']})" for m in airports.resolve(value, 3))
+        hint = f"; did you mean {suggestions}? Pass the IATA code" if suggestions else ""
+        raise ValueError(f"Unknown airport or city: {value}{hint}")
+    return code
+
+
+@mcp.tool(
+    name="resolve_airport",
+    description=(
+        "Resolve a city, airport name, alias or misspelling to IATA codes, offline. Metro codes such as "
+        "NYC or LON cover every airport of the city. The flight tools already accept city names"
+    ),
+)
+@metrics.instrument(is_error=is_error_reply)
+async def resolve_airport(query: str, limit: int = 5) -> dict:
+    return {"query": query, "matches": airports.resolve(query, limit)}
+
+
+@mcp.tool(
+    name="get_flight_details",
+    description="Fetch live flight details from Amadeus API (origin and destination: IATA codes or city names)",
+)
+@metrics.instrument(is_error=is_error_reply)
+@in_lane(request_lane)
+@single_flight.coalesce
+async def get_flight_details(origin: str, destination: str, date: str) -> str:
+    try:
+        origin, destination = airport_code(origin), airport_code(destination)
+    except ValueError as e:
+        return str(e)
+    offer = await first_offer(origin, destination, date)
+    if not offer["ok"]:
+        return offer["error"]
+    return (f"Flight with {offer['carrier']} from {origin} to {destination} on {date}, Price: {offer['price']} INR, "
+            f"Departure: {offer['departure']}, Arrival: {offer['arrival']}")
+
+FLIGHT_SEARCH_CONCURRENCY = int(os.getenv("FLIGHT_SEARCH_CONCURRENCY", "4"))
+FLIGHT_SEARCH_MAX_QUERIES = int(os.getenv("FLIGHT_SEARCH_MAX_QUERIES", "60"))
+FLIGHT_SEARCH_MAX_OFFERS = int(os.getenv("FLIGHT_SEARCH_MAX_OFFERS", "50"))
+
+
+@mcp.tool(
+    name="search_flights",
+    description=(
+        "Search flights across several origins, destinations and a date window (IATA codes or "
+        "city names, YYYY-MM-DD). Returns the top N offers sorted by price, duration or stops, "
+        "optionally filtered by carrier, departure time (HH:MM) and max stops"
+    ),
+)
+@metrics.instrument(is_error=is_error_reply)
+@in_lane(request_lane)
+@single_flight.coalesce
+async def search_flights(
+    origins: list[str],
+    destinations: list[str],
+    date_from: str,
+    date_to: str | None = None,
+    sort_by: str = "price",
+    top_n: int = 5,
+    carriers: list[str] | None = None,
+    depart_after: str | None = None,
+    depart_before: str | None = None,
+    max_stops: int | None = None,
+) -> dict:
+    # Reject bad arguments before spending any Amadeus quota (or building a huge date list)
+    check_filters(sort_by, depart_after, depart_before)
+    origins = list(dict.fromkeys(airport_code(o) for o in origins))
+    destinations = list(dict.fromkeys(airport_code(d) for d in destinations))
+    routes = [(o, d) for o in origins for d in destinations if o != d]
+    expands = len(routes) * window_days(date_from, date_to)
+    if expands > FLIGHT_SEARCH_MAX_QUERIES:
+        raise ValueError(
+            f"Search expands to {expands} route/date queries; the limit is {FLIGHT_SEARCH_MAX_QUERIES}"
+        )
+    queries = [(o, d, day) for o, d in routes for day in date_window(date_from, date_to)]
+
+    url = f"{AMADEUS_URL}/v2/shopping/flight-offers"
+    semaphore = asyncio.Semaphore(FLIGHT_SEARCH_CONCURRENCY)
+    progress = Progress(len(queries))
+    errors = []
+
+    async def query(origin, destination, day):
         params = {
             "originLocationCode": origin,
             "destinationLocationCode": destination,
-            "departureDate": date,
+            "departureDate": day,
             "adults": 1,
-            "currencyCode": "INR"
+            "currencyCode": "INR",
+            "max": FLIGHT_SEARCH_MAX_OFFERS,
         }
-        async with session.get(url, headers=headers, params=params) as resp:
-            data = await resp.json()
-            if "data" not in data or not data["data"]:
-                return f"No flights found: {data}"
+        async with semaphore:
+            try:
+                data = await amadeus_get(url, params)
+            except Exception as e:
+                data = {"errors": [{"detail": f"{type(e).__name__}: {e}"}]}
+        if "data" not in data:
+            errors.append({"origin": origin, "destination": destination, "date": day,
+                           "error": data.get("errors", data)})
+        offers = parse_offers(data, origin, destination, day)
+        await progress.step(f"{origin}→{destination} {day}: {len(offers)} offers")
+        return offers
+
+    with lane(fanout_lane()):  # the sub-requests queue behind single interactive calls
+        tables = await asyncio.gather(*(query(*q) for q in queries))
+    offers = [row for table in tables for row in table]
+    top = rank_offers(offers, sort_by, top_n, carriers, depart_after, depart_before, max_stops)
+    return {
+        "offers": [o.to_dict() for o in top],
+        "total_offers": len(offers),
+        "queries": len(queries),
+        "errors": errors,
+    }
+
+UNIT_SYMBOLS = {"metric": "°C", "imperial": "°F", "standard": "K"}
+WEATHER_BATCH_CONCURRENCY = int(os.getenv("WEATHER_BATCH_CONCURRENCY", "8"))
+
 
-            offer = data["data"][0]
-            price = offer["price"]["total"]
-            carrier = offer["validatingAirlineCodes"][0]
-            departure = offer["itineraries"][0]["segments"][0]["departure"]["at"]
-            arrival = offer["itineraries"][0]["segments"][0]["arrival"]["at"]
+async def fetch_weather(city: str, units: str = "metric") -> dict:
+    url = f"{OPENWEATHER_URL}/data/2.5/weather"
+    params = {"q": city, "appid": OPENWEATHER_KEY, "units": units}
+    _, data = await upstream_request("openweather", "weather", "GET", url, params=params)
+    return data
+
+
+async def cached_weather(city: str, units: str = "metric", fetch=fetch_weather) -> dict:
+    """OpenWeather payload for a city, served from weather_cache when possible."""
+    key = f"{units}:{normalize_city(city)}"
+    return await weather_cache.get_or_fetch(
+        key, lambda: fetch(city, units), cacheable=lambda data: "main" in data
+    )
 
-            return f"Flight with {carrier} from {origin} to {destination} on {date}, Price: {price} INR, Departure: {departure}, Arrival: {arrival}"
 
 @mcp.tool(name="get_weather", description="Get weather details for a city using OpenWeather API")
-async def get_weather(city: str) -> str:
-    url = "http://api.openweathermap.org/data/2.5/weather"
-    params = {"q": city, "appid": OPENWEATHER_KEY, "units": "metric"}
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params) as resp:
-            data = await resp.json()
-            if "main" not in data:
-                return f"Weather Error: {data}"
-
-            temp = data["main"]["temp"]
-            cond = data["weather"][0]["description"]
-            return f"Weather in {city}: {temp}°C, {cond}"
-
-@mcp.tool(name="generate_itinerary_pdf", description="Generate itinerary PDF for a city")
-async def generate_itinerary_pdf(city: str, days: int = 3) -> str:
-    # Step 1: Fetch attractions from OpenTripMap
-    url = "https://api.opentripmap.com/0.1/en/places/geoname"
+@metrics.instrument(is_error=is_error_reply)
+@in_lane(request_lane)
+@single_flight.coalesce
+async def get_weather(city: str, units: str = "metric") -> str:
+    try:
+        data = await cached_weather(city, units)
+    except UpstreamUnavailable as e:
+        return f"Upstream unavailable: {e}"
+    if "main" not in data:
+        return f"Weather Error: {data}"
+
+    temp = data["main"]["temp"]
+    cond = data["weather"][0]["description"]
+    return f"Weather in {city}: {temp}{UNIT_SYMBOLS.get(units, '')}, {cond}"
+
+async def weather_summary(city: str, units: str = "metric", fetch=fetch_weather) -> dict:
+    """Cached weather for one city as a small dict; failures are reported, not raised."""
+    try:
+        data = await cached_weather(city, units, fetch=fetch)
+    except Exception as e:
+        return {"city": city, "ok": False, "error": f"{type(e).__name__}: {e}"}
+    if "main" not in data:
+        return {"city": city, "ok": False, "error": data.get("message", str(data))}
+    return {
+        "city": city,
+        "ok": True,
+        "temp": data["main"]["temp"],
+        "units": UNIT_SYMBOLS.get(units, units),
+        "description": data["weather"][0]["description"],
+    }
+
+@mcp.tool(
+    name="get_weather_batch",
+    description="Get weather for several cities in one call (use instead of repeated get_weather calls)",
+)
+@metrics.instrument(is_error=is_error_reply)
+@in_lane(request_lane)
+@single_flight.coalesce
+async def get_weather_batch(cities: list[str], units: str = "metric") -> dict:
+    # Cache hits return immediately; only upstream fetches count against the cap
+    semaphore = asyncio.Semaphore(WEATHER_BATCH_CONCURRENCY)
+
+    async def limited_fetch(city, units):
+        async with semaphore:
+            return await fetch_weather(city, units)
+
+    progress = Progress(len(cities))
+
+    async def lookup(city):
+        result = await weather_summary(city, units, fetch=limited_fetch)
+        await progress.step(f"Weather for {city}")
+        return result
+
+    with lane(fanout_lane()):
+        results = await asyncio.gather(*(lookup(c) for c in cities))
+    return {"results": results, "failed": sum(not r["ok"] for r in results)}
+
+async def fetch_geoname(city: str) -> dict:
+    url = f"{OPENTRIPMAP_URL}/places/geoname"
     params = {"name": city, "apikey": OPENTRIPMAP_KEY}
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params) as resp:
-            geo = await resp.json()
-            if "lat" not in geo:
-                return f"City lookup failed: {geo}"
-            lat, lon = geo["lat"], geo["lon"]
-
-        url = "https://api.opentripmap.com/0.1/en/places/radius"
-        params = {"radius": 3000, "lon": lon, "lat": lat, "apikey": OPENTRIPMAP_KEY, "limit": 5}
-        async with session.get(url, params=params) as resp:
-            places = await resp.json()
-            features = places.get("features", [])
-            attractions = []
-            for f in features:
-                props = f.get("properties", {}) if isinstance(f, dict) else {}
-                name = props.get("name")
-                if name:
-                    attractions.append(name)
-
-    # Step 2: Create PDF
-    pdf_path = Path(f"itinerary_{city}.pdf")
-    doc = SimpleDocTemplate(str(pdf_path), pagesize=A4)
-    styles = getSampleStyleSheet()
-    story = [Paragraph(f"Itinerary for {city} ({days} days)", styles["Title"]), Spacer(1, 12)]
-    for day in range(1, days + 1):
-        story.append(Paragraph(f"Day {day}:", styles["Heading2"]))
-        for attraction in attractions:
-            story.append(Paragraph(f"- {attraction}", styles["Normal"]))
-        story.append(Spacer(1, 12))
-    doc.build(story)
-
-    return f"Itinerary PDF generated: {pdf_path.resolve()}"
+    _, data = await upstream_request("opentripmap", "geoname", "GET", url, params=params)
+    return data
+
+
+async def fetch_attractions(city: str, progress: Progress | None = None) -> tuple[dict, list[dict] | None]:
+    """
+    Resolve the city (geocode_store) and collect named places around it, up to
+    ITINERARY_MAX_PLACES; None if the lookup failed.
+    """
+    geo = await geocode_store.resolve(city, fetch_geoname)
+    if "lat" not in geo:
+        return geo, None
+    if progress:
+        await progress.step(f"Geocoded {city}")
+    lat, lon = geo["lat"], geo["lon"]
+
+    url = f"{OPENTRIPMAP_URL}/places/radius"
+    params = {"radius": ITINERARY_RADIUS_M, "lon": lon, "lat": lat, "apikey": OPENTRIPMAP_KEY,
+              "limit": ITINERARY_MAX_PLACES}
+    _, data = await upstream_request("opentripmap", "radius", "GET", url, params=params)
+    features = data.get("features", []) if isinstance(data, dict) else []
+    attractions, seen = [], set()
+    for f in features:
+        props = f.get("properties", {}) if isinstance(f, dict) else {}
+        coords = (f.get("geometry") or {}).get("coordinates") if isinstance(f, dict) else None
+        name = props.get("name")
+        key = props.get("xid") or name
+        if not name or not coords or key in seen:
+            continue
+        seen.add(key)
+        attractions.append({"name": name, "lat": coords[1], "lon": coords[0], "rate": props.get("rate", 0)})
+    if progress:
+        await progress.step(f"Fetched {len(attractions)} attractions")
+    return geo, attractions
+
+
+async def plan_itinerary(geo: dict, days: int, attractions: list[dict]) -> list[dict]:
+    """Group the attractions into compact days and order each day's walk (NumPy, off the event loop)."""
+    from itinerary_planner import plan_days  # NumPy loads with the first itinerary, not at start-up
+
+    with metrics.span("itinerary", "plan") as span:
+        span.size = len(attractions)
+        return await asyncio.to_thread(plan_days, attractions, days, (geo["lat"], geo["lon"]),
+                                       ITINERARY_PLACES_PER_DAY)
+
+
+async def render_itinerary(city: str, days: int, schedule: list[dict]) -> Path:
+    """Reuse a stored PDF for identical inputs, otherwise render it in the pool (may raise RenderPoolBusy)."""
+    key = artifacts.key(city, days, schedule, ITINERARY_TEMPLATE_VERSION)
+
+    async def render(tmp_path):
+        with metrics.span("reportlab", "build") as span:
+            await pdf_pool.submit(render_itinerary_pdf, tmp_path, city, days, schedule)
+            span.size = os.path.getsize(tmp_path)
+
+    pdf_path, _ = await artifacts.get_or_render(key, render)
+    return pdf_path
+
+
+def check_days(days: int):
+    if days < 1:
+        raise ValueError(f"days must be at least 1, got {days}")
+
+
+@mcp.tool(
+    name="generate_itinerary_pdf",
+    description="Generate itinerary PDF for a city (embed=true also returns the PDF itself as a resource)",
+    structured_output=False,
+)
+@metrics.instrument(is_error=is_error_reply)
+@in_lane(request_lane)
+@single_flight.coalesce
+async def generate_itinerary_pdf(city: str, days: int = 3, embed: bool = False) -> str | list:
+    check_days(days)
+    # Step 1: Resolve the city and fetch attractions from OpenTripMap
+    progress = Progress(4)
+    try:
+        geo, attractions = await fetch_attractions(city, progress)
+    except UpstreamUnavailable as e:
+        return f"Upstream unavailable: {e}"
+    if attractions is None:
+        return f"City lookup failed: {geo}"
+
+    # Step 2: Split them into compact days, each ordered as a short walk
+    schedule = await plan_itinerary(geo, days, attractions)
+    await progress.step(f"Planned {days} days")
+
+    # Step 3: Render the PDF (or reuse the stored one)
+    try:
+        pdf_path = await render_itinerary(city, days, schedule)
+    except RenderPoolBusy as e:
+        return f"Itinerary renderer busy ({e}), please retry shortly"
+    await progress.step("PDF rendered")
+
+    message = f"Itinerary PDF generated: {pdf_path.resolve()}"
+    if not embed:
+        return message
+    blob = base64.b64encode(await asyncio.to_thread(pdf_path.read_bytes)).decode("ascii")
+    return [
+        TextContent(type="text", text=message),
+        EmbeddedResource(type="resource", resource=BlobResourceContents(
+            uri=pdf_path.resolve().as_uri(), mimeType="application/pdf", blob=blob,
+        )),
+    ]
+
+@mcp.tool(
+    name="plan_trip",
+    description=(
+        "Plan a whole trip in one call: flight (origin IATA code or city to destination airport, YYYY-MM-DD), "
+        "destination weather and an itinerary PDF, fetched concurrently. Prefer this over separate "
+        "flight, weather and itinerary calls. destination_airport defaults to the airport (or metro "
+        "code) of destination_city"
+    ),
+)
+@metrics.instrument(is_error=is_error_reply)
+@in_lane(request_lane)
+@single_flight.coalesce
+async def plan_trip(origin: str, destination_city: str, date: str, days: int = 3,
+                    destination_airport: str | None = None, units: str = "metric") -> dict:
+    check_days(days)
+    progress = Progress(6)  # flight, weather, geocode, attractions, day plan, PDF
+
+    async def flight():
+        try:
+            departure = airport_code(origin)
+            arrival = airport_code(destination_airport or destination_city)
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
+        offer = await first_offer(departure, arrival, date)
+        await progress.step("Flight found" if offer["ok"] else "Flight search failed")
+        return offer
+
+    async def weather():
+        summary = await weather_summary(destination_city, units)
+        await progress.step(f"Weather for {destination_city}")
+        return summary
+
+    async def itinerary():
+        # Rendering starts as soon as the attractions arrive, while flights may still be loading
+        geo, attractions = await fetch_attractions(destination_city, progress)
+        if attractions is None:
+            return {"ok": False, "error": f"City lookup failed: {geo}"}
+        schedule = await plan_itinerary(geo, days, attractions)
+        await progress.step(f"Planned {days} days")
+        pdf_path = await render_itinerary(destination_city, days, schedule)
+        await progress.step("Itinerary PDF rendered")
+        return {"ok": True, "pdf": str(pdf_path.resolve()), "schedule": schedule}
+
+    async def part(name, coro):
+        try:
+            return name, await coro
+        except Exception as e:
+            return name, {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    parts = dict(await asyncio.gather(
+        part("flight", flight()),
+        part("weather", weather()),
+        part("itinerary", itinerary()),
+    ))
+    return {
+        "origin": origin,
+        "destination_city": destination_city,
+        "date": date,
+        "days": days,
+        **parts,
+        "failed": [name for name, result in parts.items() if not result["ok"]],
+    }
+
+@mcp.tool(
+    name="get_server_stats",
+    description="Server latency, error, cache and pool statistics (format: json or prometheus)",
+)
+async def get_server_stats(format: str = "json") -> dict | str:
+    if format == "prometheus":
+        return metrics.prometheus()
+    return metrics.snapshot()
+
+@mcp.custom_route("/healthz", methods=["GET"])
+async def liveness(request):
+    return JSONResponse({"status": "alive"})
+
+@mcp.custom_route("/readyz", methods=["GET"])
+async def readiness(request):
+    if not ready:
+        return JSONResponse({"status": "not ready"}, status_code=503)
+    return JSONResponse({"status": "ready"})
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request):
+    return PlainTextResponse(metrics.prometheus(), media_type="text/plain; version=0.0.4")
+
+
+def create_http_app():
+    """Streamable-HTTP ASGI app (one per worker process), configured from MCP_HTTP_* variables."""
+    host = os.getenv("MCP_HTTP_HOST", "127.0.0.1")
+    if host not in ("127.0.0.1", "localhost", "::1"):
+        mcp.settings.transport_security = None  # localhost-only Host check would reject remote clients
+    # Sessions live in one process, so several workers behind one port must run stateless
+    workers = int(os.getenv("MCP_HTTP_WORKERS", "1"))
+    mcp.settings.stateless_http = os.getenv("MCP_HTTP_STATELESS", "") == "1" or workers > 1
+    # Each worker has its own token buckets, so it keeps its share of the upstream quotas
+    rate_limiter.split(workers)
+    app = mcp.streamable_http_app()
+    session_manager_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def http_lifespan(app):
+        async with lifespan(mcp), session_manager_lifespan(app):
+            yield
+
+    app.router.lifespan_context = http_lifespan
+    return app
+
+
+def run_http(host: str, port: int, workers: int, grace: float):
+    import uvicorn
+
+    # Worker processes rebuild the app from these variables
+    os.environ.update(MCP_HTTP_HOST=host, MCP_HTTP_WORKERS=str(workers))
+    print(f"Travel MCP Server on http://{host}:{port}{mcp.settings.streamable_http_path} "
+          f"({workers} worker{'s' if workers > 1 else ''})", file=sys.stderr)
+    uvicorn.run(
+        "travel_server:create_http_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        timeout_graceful_shutdown=grace,
+        app_dir=str(Path(__file__).resolve().parent),
+    )
 
 
 async def main():
     await mcp.run_stdio_async()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Travel MCP Server")
+    parser.add_argument("--http", action="store_true", help="serve streamable HTTP instead of stdio")
+    parser.add_argument("--host", default=os.getenv("MCP_HTTP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("MCP_HTTP_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("MCP_HTTP_WORKERS", "1")))
+    parser.add_argument("--grace", type=float, default=float(os.getenv("MCP_HTTP_GRACE", "20")),
+                        help="seconds to let in-flight requests finish on shutdown")
+    args = parser.parse_args()
+    if args.http:
+        run_http(args.host, args.port, args.workers, args.grace)
+    else:
+        asyncio.run(main())
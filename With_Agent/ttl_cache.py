@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+In-memory LRU cache with per-entry TTL and stale-while-revalidate
+- Fresh entries are served directly
+- Stale entries (past TTL, inside the stale window) are served immediately
+  while a single background task refreshes them
+- Optional JSON persistence so the cache survives server restarts
+"""
+
+import asyncio
+import json
+import os
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+
+def normalize_city(city: str) -> str:
+    """Case-, whitespace- and diacritic-insensitive form of a city name."""
+    decomposed = unicodedata.normalize("NFKD", city)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 600.0, stale_ttl: float = 1800.0,
+                 persist_path: str | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.persist_path = Path(persist_path) if persist_path else None
+        # key -> (stored_at wall-clock seconds, value)
+        self._data: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: str):
+        """Return (value, state) where state is "fresh", "stale" or "miss"."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None, "miss"
+        age = time.time() - entry[0]
+        if age > self.ttl + self.stale_ttl:
+            del self._data[key]
+            return None, "miss"
+        self._data.move_to_end(key)
+        return entry[1], "fresh" if age <= self.ttl else "stale"
+
+    def set(self, key: str, value):
+        self._data[key] = (time.time(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_fetch(self, key: str, fetch, cacheable=lambda value: True):
+        """
+        Serve `key` from the cache, calling `fetch()` on a miss.
+        Stale hits return immediately and refresh in the background.
+        Only values accepted by `cacheable` are stored (e.g. skip API errors).
+        """
+        value, state = self.get(key)
+        if state == "fresh":
+            self.hits += 1
+            return value
+        if state == "stale":
+            self.stale_hits += 1
+            if key not in self._refreshing:
+                task = asyncio.ensure_future(self._refresh(key, fetch, cacheable))
+                self._refreshing[key] = task
+                task.add_done_callback(lambda t: self._refreshing.pop(key, None))
+            return value
+
+        self.misses += 1
+        value = await fetch()
+        if cacheable(value):
+            self.set(key, value)
+        return value
+
+    async def _refresh(self, key: str, fetch, cacheable):
+        try:
+            value = await fetch()
+        except Exception:
+            return  # keep serving the stale value until it ages out
+        if cacheable(value):
+            self.set(key, value)
+
+    def load(self):
+        """Load persisted entries, skipping anything already past its stale window."""
+        if not self.persist_path or not self.persist_path.exists():
+            return
+        try:
+            entries = json.loads(self.persist_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        cutoff = time.time() - (self.ttl + self.stale_ttl)
+        for key, stored_at, value in entries[-self.maxsize:]:
+            if stored_at > cutoff:
+                self._data[key] = (stored_at, value)
+
+    def save(self):
+        """Persist entries atomically (write to a temp file, then rename)."""
+        if not self.persist_path:
+            return
+        entries = [[key, stored_at, value] for key, (stored_at, value) in self._data.items()]
+        tmp = self.persist_path.with_suffix(self.persist_path.suffix + ".tmp")
+        tmp.write_text(json.dumps(entries), encoding="utf-8")
+        os.replace(tmp, self.persist_path)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+        }